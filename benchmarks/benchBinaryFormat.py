@@ -0,0 +1,51 @@
+import json, os, sys, tempfile, time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+import pyPlcXml
+from synthetic import tc6Project
+
+#Size and speed of the binary format and JSON Lines against plain json on a parsed TC6 project, and the time to read one POU
+#with ProjectStore
+#Usage: python benchmarks/benchBinaryFormat.py [number of POUs]
+
+def best(function, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main(pous=20000):
+    with tempfile.TemporaryDirectory() as tmp:
+        data = pyPlcXml.parse(tc6Project(os.path.join(tmp, 'project.xml'), pous))
+        paths = {name : os.path.join(tmp, 'project.' + name) for name in ('json', 'plcx', 'jsonl')}
+
+        def dumpJson():
+            with open(paths['json'], 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+        def loadJson():
+            with open(paths['json'], encoding='utf-8') as f:
+                return json.load(f)
+        formats = {
+            'json' : (dumpJson, loadJson),
+            'plcx' : (lambda: pyPlcXml.dump(data, paths['plcx']), lambda: pyPlcXml.load(paths['plcx'])),
+            'jsonl' : (lambda: pyPlcXml.dumpLines(data, paths['jsonl']), lambda: pyPlcXml.loadLines(paths['jsonl'])),
+        }
+        print(f'{pous} POUs')
+        print(f'{"format":8}{"size kB":>10}{"dump ms":>10}{"load ms":>10}')
+        for name, (dump, load) in formats.items():
+            dumpTime = best(dump)
+            loadTime = best(load)
+            assert load() == data, f'{name} round trip changed the data'
+            print(f'{name:8}{os.path.getsize(paths[name]) >> 10:>10}{dumpTime * 1e3:>10.0f}{loadTime * 1e3:>10.0f}')
+
+        #Random access decodes the shared strings, the tables of contents and one record
+        namespace = next(namespace for namespace in data['namespaces'] if namespace.get('fbs'))
+        fb = namespace['fbs'][-1]
+        def getPou():
+            with pyPlcXml.ProjectStore(paths['plcx']) as store:
+                assert store.getPou(namespace['name'], fb['name']) == fb
+        print(f'ProjectStore open and getPou {best(getPou) * 1e3:.1f} ms')
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,59 @@
+import os, sys, timeit
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+import pyPlcXml
+from pyPlcXml.helpers import _countLines
+from synthetic import stCode
+
+#Line metrics of a project with a corpus of about 1M lines of structured text, split in POUs of 300 lines.
+#helpers._countLines returns the counts of lineMetrics as a tuple, projectMetrics counts the same bodies in one pass.
+#The line based count _countLines used before counted a comment followed by code as a comment line and didnt nest comments
+#Usage: python benchmarks/benchCodeMetrics.py [number of lines]
+
+def lineBasedCount(txt):
+    """The old line based _countLines"""
+    splitLines = txt.splitlines()
+    totalLines = len(splitLines)
+    codeLines = totalLines
+    commentLines = 0
+    i = 0
+    while i < totalLines:
+        trimmedLine = splitLines[i].replace(' ', '').replace('\t', '')
+        if trimmedLine == '':
+            codeLines -= 1
+        elif trimmedLine.startswith('//'):
+            commentLines += 1
+            codeLines -= 1
+        elif trimmedLine.startswith('(*'):
+            if '*)' in trimmedLine:
+                commentLines += 1
+                codeLines -= 1
+                i += 1
+                continue
+            start = i
+            i += 1
+            while i < totalLines - 1 and '*)' not in splitLines[i]:
+                i += 1
+            end = min(i, totalLines - 1)
+            commentLines += end - start + 1
+            codeLines -= end - start + 1
+        i += 1
+    return (codeLines, commentLines, totalLines)
+
+def best(function, repeat=3):
+    return min(timeit.repeat(function, number=1, repeat=repeat))
+
+def main(lines=1000000):
+    code = stCode(300)
+    pous = [{'name' : f'PRG_{i}', 'code' : code} for i in range(max(lines // code.count('\n'), 1))]
+    data = {'namespaces' : [{'name' : 'Bench', 'prgs' : pous}]}
+    total = pyPlcXml.projectMetrics(data)['total']
+    print(f'{len(pous)} POUs, {total["total"]} lines, {total}')
+    print(f'{"counter":18}{"s":>8}')
+    for name, function in (('line based count', lambda: [lineBasedCount(pou['code']) for pou in pous]),
+                           ('_countLines', lambda: [_countLines(pou['code']) for pou in pous]),
+                           ('lineMetrics', lambda: [pyPlcXml.lineMetrics(pou['code']) for pou in pous]),
+                           ('projectMetrics', lambda: pyPlcXml.projectMetrics(data))):
+        print(f'{name:18}{best(function):>8.2f}')
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,32 @@
+import os, subprocess, sys, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from synthetic import iecProject
+
+#Peak memory and time of iec61131_10Parse against the streaming iterIec61131_10 on a synthetic IEC 61131-10 project.
+#Every mode runs in its own process so the peak resident memory of one doesnt hide the other
+#Usage: python benchmarks/benchIecStream.py [number of POUs]
+
+MODES = {
+    'parse' : 'data = pyPlcXml.parse(path)\nitems = sum(len(v) for ns in data["namespaces"] for v in ns.values() if isinstance(v, list))',
+    'iterIec61131_10' : 'items = sum(1 for nsName, kind, item in pyPlcXml.iterIec61131_10(path) if kind != "info")',
+}
+
+def run(mode, path):
+    """Runs a mode in a new process and returns the number of items, seconds and peak resident memory in MB"""
+    code = (f'import sys, time, resource\nsys.path.insert(0, {os.path.dirname(os.path.dirname(os.path.abspath(__file__)))!r})\n'
+            f'import pyPlcXml\npath = {path!r}\nstart = time.perf_counter()\n{MODES[mode]}\n'
+            'print(items, time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss >> 10)')
+    items, seconds, peak = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout.split()
+    return int(items), float(seconds), int(peak)
+
+def main(pous=100000):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = iecProject(os.path.join(tmp, 'iec.xml'), pous)
+        print(f'{pous} POUs, {os.path.getsize(path) >> 20} MB')
+        print(f'{"mode":18}{"items":>8}{"s":>8}{"peak MB":>9}')
+        for mode in MODES:
+            items, seconds, peak = run(mode, path)
+            print(f'{mode:18}{items:>8}{seconds:>8.2f}{peak:>9}')
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,38 @@
+import gc, json, os, sys, tempfile, time, tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+import pyPlcXml
+from synthetic import tc6Project
+
+#Memory of a parse result held as dictionaries against the same result as pyPlcXml.Project models, on a synthetic TC6 project.
+#Both are built from the same JSON text so the sizes dont depend on how the parser shares strings
+#Usage: python benchmarks/benchModels.py [number of POUs]
+
+def built(build):
+    """Returns the object build returns, the memory it holds in MB and the seconds it took"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] / 2 ** 20
+    tracemalloc.stop()
+    return result, size, seconds
+
+def main(pous=70000):
+    with tempfile.TemporaryDirectory() as tmp:
+        text = json.dumps(pyPlcXml.parse(tc6Project(os.path.join(tmp, 'project.xml'), pous)))
+    data, dictSize, dictTime = built(lambda: json.loads(text))
+    variables = sum(len(block.get('vars', [])) for namespace in data['namespaces'] for category in ('prgs', 'fbs', 'fcs')
+                    for pou in namespace.get(category) or [] for block in pou.get('if') or [])
+    del data
+    project, modelSize, modelTime = built(lambda: pyPlcXml.Project.fromDict(json.loads(text)))
+    assert project.toDict() == json.loads(text)
+    print(f'{pous} POUs, {variables} interface variables')
+    print(f'{"result":14}{"MB":>8}{"s":>8}')
+    print(f'{"dictionaries":14}{dictSize:>8.1f}{dictTime:>8.2f}')
+    print(f'{"models":14}{modelSize:>8.1f}{modelTime:>8.2f}')
+    print(f'models need {1 - modelSize / dictSize:.0%} less memory')
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
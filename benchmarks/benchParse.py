@@ -0,0 +1,54 @@
+import os, sys, tempfile, time
+root = sys.argv[2] if len(sys.argv) > 2 else os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, root)
+import xml.etree.ElementTree as ET
+from lxml import etree
+import pyPlcXml
+from synthetic import tc6Project, iecProject
+
+#How often parse reads an xml document and how long it takes, on synthetic TC6 and IEC 61131-10 projects
+#Usage: python benchmarks/benchParse.py [number of POUs] [package root]
+#   package root is a checkout of another version of pyPlcXml to compare with, default this one
+
+class ParseCounter:
+    """Counts the calls of the xml parse functions of lxml and the standard library that read path"""
+    FUNCTIONS = [(etree, 'parse'), (etree, 'iterparse'), (ET, 'parse'), (ET, 'iterparse')]
+
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+
+    def __enter__(self):
+        self.originals = [getattr(module, name) for module, name in self.FUNCTIONS]
+        for (module, name), original in zip(self.FUNCTIONS, self.originals):
+            setattr(module, name, self._wrap(original))
+        return self
+
+    def __exit__(self, *args):
+        for (module, name), original in zip(self.FUNCTIONS, self.originals):
+            setattr(module, name, original)
+
+    def _wrap(self, function):
+        def counted(source, *args, **kwargs):
+            if source == self.path:
+                self.count += 1
+            return function(source, *args, **kwargs)
+        return counted
+
+def main(pous=20000):
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = {'TC6 v2.01' : tc6Project(os.path.join(tmp, 'tc6.xml'), pous),
+                 'IEC 61131-10' : iecProject(os.path.join(tmp, 'iec.xml'), pous)}
+        print(f'{pous} POUs, pyPlcXml from {os.path.abspath(os.path.dirname(pyPlcXml.__file__))}')
+        for name, path in paths.items():
+            for strict in (False, True):
+                #Older versions ignore strict and always validate
+                with ParseCounter(path) as counter:
+                    start = time.perf_counter()
+                    data = pyPlcXml.parse(path, strict=strict)
+                    wallTime = time.perf_counter() - start
+                assert data != None, f'{name} file was not parsed'
+                print(f'{name:14}{os.path.getsize(path) >> 20:>5} MB strict={strict!s:6}{counter.count:>3} parses{wallTime:>8.2f} s')
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:2]))
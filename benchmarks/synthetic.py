@@ -0,0 +1,106 @@
+import os, re
+
+#Synthetic projects of any size for the benchmarks, built by repeating the POUs and namespaces of the test fixtures
+
+DATA = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, 'tests', 'data')
+
+def tc6Project(path, pous=10000):
+    """Writes a TC6 v2.01 project with about pous POUs to path and returns path"""
+    with open(os.path.join(DATA, 'v201.xml'), encoding='utf-8') as f:
+        txt = f.read()
+    start, end = txt.index('<pous>') + len('<pous>'), txt.index('</pous>')
+    blocks = re.findall(r'<pou .*?</pou>', txt[start:end], re.S)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(txt[:start])
+        for i in range(max(pous // len(blocks), 1)):
+            for block in blocks:
+                f.write(re.sub(r'<pou name="(\w+)"', rf'<pou name="\1_{i}"', block, count=1))
+        f.write(txt[end:])
+    return path
+
+def iecProject(path, pous=100000):
+    """Writes an IEC 61131-10 project with about pous POUs to path and returns path"""
+    with open(os.path.join(DATA, 'iec.xml'), encoding='utf-8') as f:
+        txt = f.read()
+    namespace = re.search(r'<NamespaceDecl name="Ns0">.*?</NamespaceDecl>', txt, re.S).group()
+    perNamespace = len(re.findall(r'<(?:Program|FunctionBlock|Function) name=', namespace))
+    end = txt.index('</GlobalNamespace>')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(txt[:end])
+        for i in range(max(pous // perNamespace, 1)):
+            f.write(namespace.replace('name="Ns0"', f'name="Bench{i}"', 1))
+        f.write(txt[end:])
+    return path
+
+def stCode(lines=1000000):
+    """Returns structured text with about lines lines of code, comments, blank lines and strings"""
+    block = '''(* Block comment
+   over two lines *)
+IF x > 0 THEN // trailing comment
+    y := 'text with (* no comment *)';
+
+    z := x (* inline *) + 1;
+END_IF
+/* C style
+comment */
+a := "//not a comment";
+'''
+    return block * max(lines // block.count('\n'), 1)
+
+_BR_FUN = '''
+FUNCTION_BLOCK FB_Motor{i} (*Motor control*)
+\tVAR_INPUT
+\t\tEnable : BOOL; (*enable*)
+\t\tSpeed : REAL := 1.5; (*speed*) (*f1*)
+\tEND_VAR
+\tVAR_OUTPUT
+\t\tActive : BOOL;
+\tEND_VAR
+\tVAR
+\t\tstate : INT;
+\t\ttimer : TON;
+\tEND_VAR
+END_FUNCTION_BLOCK
+
+FUNCTION FC_Add{i} : INT
+\tVAR_INPUT
+\t\ta : INT;
+\t\tb : INT;
+\tEND_VAR
+END_FUNCTION
+'''
+
+_BR_ST = '''
+FUNCTION_BLOCK FB_Motor{i}
+\tIF Enable THEN
+\t\tActStart;
+\tEND_IF
+\tActive := Enable;
+END_FUNCTION_BLOCK
+
+ACTION ActStart{i}:
+\tstate := 1;
+\tActStop;
+END_ACTION
+'''
+
+_BR_TYP = '''
+TYPE
+\tST_Data{i} : \tSTRUCT (*struct desc*)
+\t\tx : INT := 5; (*x desc*)
+\t\ty : {{REDUND_UNREPLICABLE}} REAL; (*y*)
+\t\tz : ARRAY[0..9]OF BOOL;
+\tEND_STRUCT;
+\tE_Mode{i} : 
+\t\t( (*enum desc*)
+\t\tMODE_A := 0, (*a*)
+\t\tMODE_B, (*b*)
+\t\tMODE_C
+\t\t) := MODE_A;
+END_TYPE
+'''
+
+def brSources(count=1000):
+    """Returns B&R .fun, .st and .typ file contents with count function blocks, functions, actions and types each"""
+    return {extension : ''.join(template.format(i=i) for i in range(count))
+            for extension, template in (('fun', _BR_FUN), ('st', _BR_ST), ('typ', _BR_TYP))}
@@ -1 +1,12 @@
-from .main import parse, validate
\ No newline at end of file
+__version__ = '0.0.4'
+
+from .main import parse, parseMany, validate
+from .xmlParsers import iterTc6, iterIec61131_10
+from .schemaRegistry import getSchema, warmupSchemas
+from .binaryFormat import dump, load, ProjectStore
+from .jsonLines import dumpLines, iterLines, loadLines
+from .models import Project, Namespace, Pou, VarBlock, Variable, DataType
+from .varTable import VarTable
+from .xref import XRef, findUsages
+from .codeMetrics import lineMetrics, projectMetrics, metricsFromItems
+from .docStrings import extractDocStrings, attachDocStrings
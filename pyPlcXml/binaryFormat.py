@@ -0,0 +1,392 @@
+import json, struct, sys, mmap, threading
+from array import array
+from collections import Counter
+from itertools import repeat
+
+#Binary format of parsed projects, all numbers are little endian:
+#   header : magic, format version, number of namespaces
+#   info : record with everything except the namespaces
+#   per namespace : one record per item of its lists (prgs, fbs, fcs, class, dts, vars...) followed by
+#       the table of contents of the namespace with its other fields and the offset of every record
+#   table of contents : record with the info record and the name of every namespace with its table of contents
+#   value table : UTF-8 JSON object, 'values' is the list of every dictionary key and every value used more than once in the
+#       project, 'shapes' is the list of dictionary key lists as indexes into 'values'
+#   trailer : offset and length of the table of contents, offset and length of the value table, magic
+#A record is decoded on its own: three uint32 with the length of a UTF-8 JSON list, the number of containers and the number of
+#item codes, the JSON list of the values used only by that record, one uint32 header per container and then the uint32 item
+#codes. Containers are in post order, a header is (shape << 2 | 0) for a dictionary, (length << 2 | 1) for a list,
+#(length << 2 | 2) for a tuple or (shape << 2 | 3) for a list of dictionaries of the same shape, which is followed by a code
+#with the number of dictionaries. The items of a container are the next codes, a code is an index into the value table
+#followed by the values of the record and its containers so far. The last container is the record.
+#Strings like type names and dictionary keys are stored once per project. Reading a file only decodes JSON and integers, so
+#a file from an untrusted source cant run code. The format is the same for every python version and a damaged file raises ValueError
+MAGIC = b'PLCX'
+FORMAT_VERSION = 3
+_HEADER = struct.Struct('<4sHI')
+_TRAILER = struct.Struct('<QQQQ4s')
+_RECORD = struct.Struct('<III')
+_DICT, _LIST, _TUPLE, _TABLE = range(4)
+#Decodes one JSON value without the checks of json.loads, the values of a record are a JSON list
+_scanJson = json.JSONDecoder().scan_once
+#Keys of the tables of contents
+_TOC_KEYS = ('info', 'namespaces', 'keys', 'meta', 'lists')
+
+#Namespace lists searched by ProjectStore.getPou
+POU_CATEGORIES = ('prgs', 'fbs', 'fcs', 'class')
+
+def dump(data, fp):
+    """Writes the parsed data dictionary to fp in the binary format. fp is a path or a binary file object.
+    Values are dictionaries with string keys, lists, tuples, strings, numbers, booleans and None, raises TypeError for anything else"""
+    if isinstance(fp, str):
+        with open(fp, 'wb') as f:
+            return dump(data, f)
+    namespaces = data.get('namespaces', [])
+    writer = _Writer(fp, _sharedValues(data))
+    writer.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(namespaces)))
+    toc = {
+        'info' : writer.writeRecord({key : value for key, value in data.items() if key != 'namespaces'}),
+        'namespaces' : []
+    }
+    for namespace in namespaces:
+        nsToc = {
+            'keys' : list(namespace),
+            'meta' : {},
+            'lists' : {}
+        }
+        for key, value in namespace.items():
+            #Lists of items are stored as records, everything else is stored in the table of contents
+            if isinstance(value, list) and all(isinstance(item, dict) for item in value):
+                nsToc['lists'][key] = [(item.get('name'),) + writer.writeRecord(item) for item in value]
+            else:
+                nsToc['meta'][key] = value
+        toc['namespaces'].append((namespace.get('name'),) + writer.writeRecord(nsToc))
+
+    tocLocation = writer.writeRecord(toc)
+    writer.write(_TRAILER.pack(*tocLocation, *writer.writeValueTable(), MAGIC))
+
+def load(fp):
+    """Reads parsed data written by dump from fp, a path or a binary file object, and returns the data dictionary"""
+    if isinstance(fp, str):
+        with ProjectStore(fp) as store:
+            return store.toDict()
+    return ProjectStore(buffer=fp.read()).toDict()
+
+class ProjectStore:
+    """Read only random access to a file written by dump. The file is memory mapped and only the value table and the list of
+    namespaces are decoded when it is opened. Namespaces and their items are decoded when they are requested, so memory grows
+    with what is used.
+
+        with ProjectStore('project.plcx') as store:
+            fb = store.getPou('MyNs', 'FB_Motor')
+    """
+
+    def __init__(self, path=None, buffer=None):
+        """path - file written by dump, it is memory mapped
+        buffer - bytes written by dump, used instead of a path
+        Raises ValueError if the data is not a complete binary project, the file is closed before"""
+        self._file = None
+        if buffer == None:
+            self._file = open(path, 'rb')
+            try:
+                buffer = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                #Empty files cant be mapped
+                buffer = b''
+        self._buffer = buffer
+
+        try:
+            if len(buffer) < _HEADER.size + _TRAILER.size:
+                raise ValueError('Not a binary pyPlcXml file, file is too short')
+            magic, formatVersion, nsCount = _HEADER.unpack_from(buffer, 0)
+            if magic != MAGIC:
+                raise ValueError('Not a binary pyPlcXml file')
+            if formatVersion != FORMAT_VERSION:
+                raise ValueError(f'Unsupported binary format version {formatVersion}, expected {FORMAT_VERSION}')
+            tocOffset, tocLength, tableOffset, tableLength, magic = _TRAILER.unpack_from(buffer, len(buffer) - _TRAILER.size)
+            if magic != MAGIC:
+                raise ValueError('Binary pyPlcXml file is truncated')
+
+            self._check(tableOffset, tableLength)
+            table = json.loads(str(buffer[tableOffset:tableOffset + tableLength], 'utf-8', 'surrogatepass'))
+            values = table['values']
+            self._shapes = [tuple(values[index] for index in shape) for shape in table['shapes']]
+            #Records are decoded at the end of the value table and removed again, the lock keeps threads from sharing it
+            self._objects = list(values)
+            self._lock = threading.Lock()
+            toc = self._record(tocOffset, tocLength)
+            self.info = self._record(*toc['info'])
+            self._toc = toc['namespaces']
+
+            #Namespace name to its position, tables of contents of namespaces are decoded on first use
+            self._nsPos = {}
+            for pos, (nsName, nsTocOffset, nsTocLength) in enumerate(self._toc):
+                self._nsPos.setdefault(nsName, pos)
+        except ValueError:
+            self.close()
+            raise
+        except (TypeError, IndexError, KeyError, struct.error) as e:
+            #A damaged table of contents has records of the wrong shape
+            self.close()
+            raise ValueError(f'Binary pyPlcXml file is damaged: {e}') from None
+        self._nsTocs = {}
+        self._nameIndex = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Unmaps and closes the file"""
+        if self._file != None:
+            if isinstance(self._buffer, mmap.mmap):
+                self._buffer.close()
+            self._file.close()
+            self._file = None
+
+    def namespaces(self):
+        """Returns a list of the namespace names in the order they were parsed"""
+        return [nsName for nsName, nsTocOffset, nsTocLength in self._toc]
+
+    def names(self, nsName, category):
+        """Returns a list of the item names of a namespace list like 'fbs' or 'dts'"""
+        return [name for name, offset, length in self._nsToc(nsName)['lists'].get(category, [])]
+
+    def get(self, nsName, category, name):
+        """Returns the item of a namespace list with the given name or None. Only that item is decoded"""
+        key = (nsName, category)
+        index = self._nameIndex.get(key)
+        if index == None:
+            index = {}
+            for itemName, offset, length in self._nsToc(nsName)['lists'].get(category, []):
+                index.setdefault(itemName, (offset, length))
+            self._nameIndex[key] = index
+        location = index.get(name)
+        return self._record(*location) if location != None else None
+
+    def getPou(self, nsName, name):
+        """Returns the program, function block, function or class with the given name in a namespace or None"""
+        for category in POU_CATEGORIES:
+            pou = self.get(nsName, category, name)
+            if pou != None:
+                return pou
+        return None
+
+    def getNamespace(self, nsName):
+        """Returns a whole namespace in the same format as parse, raises KeyError for an unknown namespace"""
+        self._nsToc(nsName)
+        return self._namespaceAt(self._nsPos[nsName])
+
+    def toDict(self):
+        """Returns the whole project in the same format as parse"""
+        data = dict(self.info)
+        #Namespaces are decoded by position so namespaces with the same name are all returned
+        data['namespaces'] = [self._namespaceAt(pos) for pos in range(len(self._toc))]
+        return data
+
+    def _nsToc(self, nsName):
+        """Returns the decoded table of contents of a namespace, raises KeyError for an unknown namespace"""
+        if nsName not in self._nsPos:
+            raise KeyError(f'Namespace {nsName} is not in the project')
+        return self._nsTocAt(self._nsPos[nsName])
+
+    def _nsTocAt(self, pos):
+        nsToc = self._nsTocs.get(pos)
+        if nsToc == None:
+            nsToc = self._nsTocs[pos] = self._record(*self._toc[pos][1:])
+        return nsToc
+
+    def _namespaceAt(self, pos):
+        nsToc = self._nsTocAt(pos)
+        namespace = {}
+        for key in nsToc['keys']:
+            if key in nsToc['lists']:
+                namespace[key] = [self._record(offset, length) for name, offset, length in nsToc['lists'][key]]
+            else:
+                namespace[key] = nsToc['meta'][key]
+        return namespace
+
+    def _record(self, offset, length):
+        """Decodes the record at offset"""
+        self._check(offset, length)
+        try:
+            with self._lock:
+                return _decode(self._buffer, offset, length, self._objects, self._shapes)
+        except (TypeError, IndexError, struct.error) as e:
+            raise ValueError(f'Binary pyPlcXml file is damaged: {e}') from None
+
+    def _check(self, offset, length):
+        if offset + length > len(self._buffer):
+            raise ValueError('Binary pyPlcXml file is truncated')
+
+def _decode(buffer, offset, length, objects, shapes):
+    """Decodes the record at offset. objects is the value table, the values of the record are appended to it while decoding"""
+    valuesLength, count, itemCount = _RECORD.unpack_from(buffer, offset)
+    start = offset + _RECORD.size
+    end = start + valuesLength
+    if end + 4 * (count + itemCount) != offset + length or count == 0:
+        raise ValueError('Binary pyPlcXml file is damaged, record has the wrong length')
+    text = str(buffer[start:end], 'utf-8', 'surrogatepass')
+    try:
+        values, valuesEnd = _scanJson(text, 0)
+    except StopIteration:
+        valuesEnd = None
+    if valuesEnd != len(text) or type(values) is not list:
+        raise ValueError('Binary pyPlcXml file is damaged, record values are not a JSON list')
+    codes = array('I', buffer[end:offset + length])
+    if sys.byteorder == 'big':
+        codes.byteswap()
+    base = len(objects)
+    objects.extend(values)
+    get, append = objects.__getitem__, objects.append
+    try:
+        pos = count
+        for header in codes[:count]:
+            kind = header & 3
+            if kind == _DICT:
+                keys = shapes[header >> 2]
+                stop = pos + len(keys)
+                append(dict(zip(keys, map(get, codes[pos:stop]))))
+            elif kind == _TABLE:
+                keys = shapes[header >> 2]
+                rows = codes[pos]
+                pos += 1
+                stop = pos + rows * len(keys)
+                cells = map(get, codes[pos:stop])
+                append(list(map(dict, map(zip, repeat(keys, rows), zip(*[cells] * len(keys))))))
+            else:
+                stop = pos + (header >> 2)
+                append((list if kind == _LIST else tuple)(map(get, codes[pos:stop])))
+            pos = stop
+        if pos != len(codes):
+            raise ValueError('Binary pyPlcXml file is damaged, containers have the wrong length')
+        return objects[-1]
+    finally:
+        del objects[base:]
+
+def _key(value):
+    """Returns the key a value is stored under. Equal values of different types like 1, 1.0 and True get different keys"""
+    if type(value) is str:
+        return value
+    if isinstance(value, str):
+        return str(value)
+    if isinstance(value, bool) or value == None:
+        return (type(value), value)
+    if isinstance(value, int):
+        return (int, int(value))
+    if isinstance(value, float):
+        #repr keeps -0.0 apart from 0.0 and makes nan equal to itself
+        return (float, repr(float(value)))
+    raise TypeError(f'Cannot store {type(value).__name__} in the binary format')
+
+def _value(key):
+    """Returns the value of a key made by _key"""
+    if type(key) is str:
+        return key
+    kind, value = key
+    return float(value) if kind is float else value
+
+def _sharedValues(data):
+    """Returns the keys of the value table of data, every dictionary key and every value used more than once"""
+    keys, dictKeys = list(_TOC_KEYS), set(_TOC_KEYS)
+    def collect(items):
+        for item in items:
+            if type(item) is str:
+                keys.append(item)
+            elif isinstance(item, dict):
+                keys.extend(item)
+                dictKeys.update(item)
+                collect(item.values())
+            elif isinstance(item, (list, tuple)):
+                collect(item)
+            else:
+                keys.append(_key(item))
+    collect([data])
+    return [key for key, count in Counter(keys).items() if count > 1 or key in dictKeys]
+
+class _Writer:
+    """Writes to a binary file object and keeps track of the offset from where writing started and of the value table"""
+    def __init__(self, fp, shared):
+        self.fp = fp
+        self.offset = 0
+        self.shared = {key : index for index, key in enumerate(shared)}
+        self.shapes = {}
+        self.knownShapes = {}
+
+    def write(self, blob):
+        self.fp.write(blob)
+        self.offset += len(blob)
+
+    def writeRecord(self, value):
+        """Writes value, a dictionary, list or tuple, as a record and returns a tuple of its offset and length"""
+        shared, values, valueIndex, headers, codes = self.shared, [], {}, [], []
+        base = len(shared)
+        def encode(value):
+            """Appends the codes of value and returns its code, containers get negative codes until the record is complete"""
+            #Shared strings are the most common items and are looked up without a call
+            if isinstance(value, dict):
+                header = self._shape(value) << 2 | _DICT
+                itemCodes = [shared[item] if type(item) is str and item in shared else encode(item) for item in value.values()]
+            elif isinstance(value, list) and value and _sameKeys(value):
+                header = self._shape(value[0]) << 2 | _TABLE
+                itemCodes = [len(value)] + [shared[cell] if type(cell) is str and cell in shared else encode(cell)
+                                            for item in value for cell in item.values()]
+            elif isinstance(value, (list, tuple)):
+                header = len(value) << 2 | (_LIST if isinstance(value, list) else _TUPLE)
+                itemCodes = [shared[item] if type(item) is str and item in shared else encode(item) for item in value]
+            else:
+                key = value if type(value) is str else _key(value)
+                index = shared.get(key)
+                if index != None:
+                    return index
+                index = valueIndex.get(key)
+                if index == None:
+                    index = valueIndex[key] = base + len(values)
+                    values.append(_value(key))
+                return index
+            headers.append(header)
+            codes.extend(itemCodes)
+            return -len(headers)
+
+        if encode(value) >= 0:
+            raise TypeError('Records are dictionaries, lists or tuples')
+        #Containers follow the values of the record
+        containers = base + len(values) - 1
+        codes = array('I', headers + [code if code >= 0 else containers - code for code in codes])
+        if sys.byteorder == 'big':
+            codes.byteswap()
+        valuesBlob = json.dumps(values, ensure_ascii=False, separators=(',', ':')).encode('utf-8', 'surrogatepass')
+        offset = self.offset
+        self.write(_RECORD.pack(len(valuesBlob), len(headers), len(codes) - len(headers)))
+        self.write(valuesBlob)
+        self.write(codes.tobytes())
+        return offset, self.offset - offset
+
+    def writeValueTable(self):
+        """Writes the value table and returns a tuple of its offset and length"""
+        table = {
+            'values' : [_value(key) for key in self.shared],
+            'shapes' : list(self.shapes)
+        }
+        offset = self.offset
+        self.write(json.dumps(table, ensure_ascii=False, separators=(',', ':')).encode('utf-8', 'surrogatepass'))
+        return offset, self.offset - offset
+
+    def _shape(self, value):
+        """Returns the shape of a dictionary"""
+        keys = tuple(value)
+        shape = self.knownShapes.get(keys)
+        if shape == None:
+            if not all(isinstance(key, str) for key in keys):
+                raise TypeError('Dictionary keys must be strings in the binary format')
+            indexes = tuple(self.shared[key] for key in keys)
+            shape = self.knownShapes[keys] = self.shapes.setdefault(indexes, len(self.shapes))
+        return shape
+
+def _sameKeys(items):
+    """Returns True if items are dictionaries with the same keys in the same order and at least one key"""
+    if type(items[0]) is not dict or not items[0]:
+        return False
+    keys = tuple(items[0])
+    return all(type(item) is dict and tuple(item) == keys for item in items)
@@ -1,41 +1,30 @@
+from . import __version__
 from .helpers import ns
+from .brRegex import (RX_PRG_ST_CYCLIC, RX_PRG_ST_INIT, RX_PRG_ST_EXIT, RX_PRG_C_CYCLIC, RX_PRG_C_INIT, RX_PRG_C_EXIT,
+    RX_POU_ST_IDENT, RX_POU_C_IDENT, RX_FB_IDENT, RX_FC_IDENT, RX_ACTION_IDENT, RX_ACTION_CANDIDATE)
+from .stParser import parseInterface, parseTypes
 
 #Standard lib dependencies
-import os, re, datetime
+import os, datetime, warnings, hashlib, pickle
+from collections import deque
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
 
-#Setup regex patterns
-RX_VAR_IDENTS = (
-    r'VAR_INPUT\s?(?P<Attribute>RETAIN)?(?P<Members>.*?)END_VAR',
-    r'VAR_OUTPUT\s?(?P<Attribute>RETAIN)?(?P<Members>.*?)END_VAR',
-    r'VAR_IN_OUT\s?(?P<Attribute>RETAIN)?(?P<Members>.*?)END_VAR',
-    r'\bVAR\s(?P<Attribute>(RETAIN|CONSTANT))?(?P<Members>.*?)END_VAR'
-)
-RX_VAR_MEMBER = r'(\s*(?P<Name>.*?)\s*):(\s*(?P<Redund>{.*?})?\s*)((?P<Type>.*?)\s*)(;\s*|\s*:=\s*(?P<Initial>.*?)\s*;\s*)\s*((\(\*(?P<Desc1>.*?)\*\)\s*)?(\(\*(?P<Desc2>.*?)\*\)\s*)?(\(\*(?P<Desc3>.*?)\*\)\s*)?)'
-RX_PRG_ST_CYCLIC = r'(PROGRAM _CYCLIC)(?P<Code>.*?)(END_PROGRAM)'
-RX_PRG_ST_INIT = r'(PROGRAM _INIT)(?P<Code>.*?)(END_PROGRAM)'
-RX_PRG_ST_EXIT = r'(PROGRAM _EXIT)(?P<Code>.*?)(END_PROGRAM)'
-RX_POU_ST_IDENT = r"(FUNCTION_BLOCK|FUNCTION)\s+(?P<Name>(\w+|\w+_\w+_\w+))\s(?P<Code>.*?)(END_FUNCTION_BLOCK|END_FUNCTION)"
-RX_PRG_C_CYCLIC = r'void\s+_CYCLIC\s+(.*?)\(.*?\)\s*{(?P<Code>.*)}'
-RX_PRG_C_INIT = r'void\s+_INIT\s+(.*?)\(.*?\)\s*{(?P<Code>.*)}'
-RX_PRG_C_EXIT = r'void\s+_EXIT\s+(.*?)\(.*?\)\s*{(?P<Code>.*)}'
-RX_POU_C_IDENT = r'(?P<ReturnType>void)\s+(?P<Name>.*?)\s*?(?P<Parameters>\(.*?\))\s*{(?P<Code>.+?)}'
-RX_FB_IDENT = r'({REDUND_(OK|ERROR)})?\s*FUNCTION_BLOCK\s+(?P<Name>.*?)\s+(?P<Interface>.*?)END_FUNCTION_BLOCK'
-RX_FC_IDENT = r'({REDUND_(OK|ERROR)})?\s*\bFUNCTION\s+(?P<Name>.*?)\s*:\s*(?P<ReturnType>.*?)\s(?P<Interface>.*?)\bEND_FUNCTION'
-RX_ACTION_IDENT = r'ACTION\s(?P<Name>.*?):(?P<Code>.*?)END_ACTION'
-RX_ACTION_CANDIDATE = r'(?<!:=)\s(?P<ActionName>[A-Za-z0-9_]*);'
-RX_TYP_IDENT = r'TYPE\s(?P<StructData>.*?)END_TYPE'
-RX_ENUM_VAR = r'(\s*(?P<VarName>.*?)\s*)(:=\s*(?P<Initial>.*?)\s*?)?[,\s]*((\(\*(?P<Desc1>.*?)\*\)\s*?)?(\(\*(?P<Desc2>.*?)\*\)\s*?)?(\(\*(?P<Desc3>.*?)\*\)\s*?)?)\n'
-RX_ENUM_IDENT = r'(\s*(?P<Name>.*?)\s*):(\s*\()((\(\*(?P<Desc1>.*?)\*\)\s*)?(\(\*(?P<Desc2>.*?)\*\)\s*)?(\(\*(?P<Desc3>.*?)\*\)\s*)?)(?P<Data>.*?)(\);|\)\s*?:=(\s*(?P<Initial>.*?)\s*);)'
-RX_STRUCT_IDENT = r'(\s*(?P<Name>.*?)\s*):(\s*(?P<Redund>{.*?})\s*)?(\s*STRUCT\s*)((\(\*(?P<Desc1>.*?)\*\)\s*)?(\(\*(?P<Desc2>.*?)\*\)\s*)?(\(\*(?P<Desc3>.*?)\*\)\s*)?)(?P<Data>.*?)(END_STRUCT;)'
-RX_STRUCT_START = r'\s*.*\s*:\s*({.*})?\s*(STRUCT)+'
-RX_STRUCT_END = r'\s*END_STRUCT;'
-RX_ENUM_START = r'(.*\s*:\s*?)$'
-RX_ENUM_END = r'(\)\s*(:=)?.*;)$'
-
-def brParse(rootPath, ignoredNs=()):
-
-    """Returns a data dictionary of format:
+#Files the B&R parsers read, everything else is left out of the project index
+BR_EXTENSIONS = ('.lby', '.prg', '.fun', '.var', '.typ', '.st', '.ab', '.c', '.pkg')
+
+#Format of the incremental parse cache, a cache file with another version or written by another version of pyPlcXml is ignored
+#because the parsers and the data they return change between releases
+CACHE_VERSION = 1
+
+def brParse(rootPath, ignoredNs=(), workers=None, cache=None):
+
+    """workers - number of processes that parse the libraries and program namespaces in parallel.
+    By default everything is parsed in this process. Namespaces are always returned in the same order.
+    cache - path to a cache file for incremental parsing. It stores the mtime, size and hash of every file a namespace
+    was parsed from together with the parsed namespace. On the next parse only namespaces with changed, added
+    or removed files are parsed again, the others are taken from the cache. The cache is a pickle, only use cache files you wrote.
+    Returns a data dictionary of format:
     {
         #Project information
         info : {
@@ -81,24 +70,178 @@ def brParse(rootPath, ignoredNs=()):
 		'contentGenerated' : str(datetime.datetime.now())
     }
 
+    #Walk the Logical folder once, all namespace parsers query this index instead of the disk
+    index = _indexProject(os.path.join(os.path.dirname(rootPath), 'Logical'))
+
+    #Namespaces parsed by the previous run with the mtime, size and hash of their files
+    projectDir = os.path.dirname(rootPath)
+    manifest = _loadManifest(cache) if cache != None else {}
+    newManifest = {}
+
     #Load the global namespace
-    data['namespaces'] = [_parsegNs(path=os.path.join(os.path.dirname(rootPath), 'Logical'), ignoredNs=[])]
+    gFiles = _gNsFiles(index)
+    data['namespaces'] = [_cachedNs(manifest, newManifest, projectDir, 'Global', gFiles['typ'])]
+    if data['namespaces'][0] == None:
+        data['namespaces'][0] = _parsegNs(path=os.path.join(projectDir, 'Logical'), ignoredNs=[], index=index)
+        newManifest['Global']['data'] = data['namespaces'][0]
 
     #Load the libraries with the valid names(coming from cfg)
-    for root, _, files in os.walk(os.path.join(os.path.dirname(rootPath), 'Logical')):
+    nsPaths = []
+    for root in index['dirs']:
         #Filter out all files except '.lby' and '.prg'
-        files = [fi for fi in files if fi.endswith(('.lby', '.prg')) and fi.lower() != 'binary.lby']
+        files = [fi for fi in index['files'][root] if fi.endswith(('.lby', '.prg')) and fi.lower() != 'binary.lby']
         for file in files:
             filepath = os.path.join(root, file)
             dirName = os.path.basename(os.path.dirname(filepath))
             #Skip if the namespace is ignored or lby is binary
             if dirName not in ignoredNs and dirName not in ['IecCheck']:
-                data['namespaces'].append(_parseNs(path=filepath))
+                nsPaths.append(filepath)
+    nsFiles = [_nsFiles(index, os.path.dirname(filepath)) for filepath in nsPaths]
+
+    #Take unchanged namespaces from the cache, only the rest is parsed
+    namespaces = []
+    for filepath, files in zip(nsPaths, nsFiles):
+        touched = [filepath, os.path.join(os.path.dirname(os.path.dirname(filepath)), 'Package.pkg'), files.get('fun')]
+        touched = [fpath for fpath in touched if fpath != None] + files['varFiles'] + files['typFiles'] + files['codeFiles']
+        namespaces.append(_cachedNs(manifest, newManifest, projectDir, filepath, touched))
+    toParse = [i for i, namespace in enumerate(namespaces) if namespace == None]
+
+    if workers and workers > 1 and len(toParse) > 1:
+        #map returns the namespaces in the order of nsPaths so the output matches the sequential parse
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = list(executor.map(_parseNs, [nsPaths[i] for i in toParse], [nsFiles[i] for i in toParse]))
+    else:
+        parsed = [_parseNs(path=nsPaths[i], files=nsFiles[i]) for i in toParse]
+    for i, namespace in zip(toParse, parsed):
+        namespaces[i] = namespace
+        newManifest[os.path.relpath(nsPaths[i], projectDir)]['data'] = namespace
+    data['namespaces'].extend(namespaces)
+
+    #The cache is only rewritten if a file changed, the parsed data only changes with the files
+    if cache != None and {key : entry['files'] for key, entry in newManifest.items()} != {key : entry.get('files') for key, entry in manifest.items()}:
+        _saveManifest(cache, newManifest)
     return data
 
-def _parseNs(path):
+def _loadManifest(cache):
+    """Returns the namespaces stored in the cache file or an empty dictionary if there is no usable cache"""
+    try:
+        with open(cache, 'rb') as f:
+            manifest = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get('version') != CACHE_VERSION or manifest.get('pyPlcXml') != __version__:
+        return {}
+    return manifest.get('namespaces', {})
+
+def _saveManifest(cache, namespaces):
+    """Writes the cache file. It is written next to the old one and then replaced so an interrupted write never leaves a broken cache"""
+    tmpPath = f'{cache}.{os.getpid()}.tmp'
+    with open(tmpPath, 'wb') as f:
+        pickle.dump({'version' : CACHE_VERSION, 'pyPlcXml' : __version__, 'namespaces' : namespaces}, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmpPath, cache)
+
+def _cachedNs(manifest, newManifest, projectDir, key, files):
+    """Returns the cached data of a namespace if it was parsed from the same files with the same content, otherwise None.
+    The current state of the files is recorded in newManifest under the key of the namespace, relative to the project,
+    files whose mtime and size didnt change are not hashed again"""
+    key = os.path.relpath(key, projectDir) if key != 'Global' else key
+    entry = manifest.get(key, {})
+    oldStamps = entry.get('files', {})
+    stamps = {}
+    for fpath in files:
+        relPath = os.path.relpath(fpath, projectDir)
+        stat = os.stat(fpath)
+        old = oldStamps.get(relPath)
+        if old != None and old[0] == stat.st_mtime_ns and old[1] == stat.st_size:
+            stamps[relPath] = old
+        else:
+            with open(fpath, 'rb') as f:
+                stamps[relPath] = [stat.st_mtime_ns, stat.st_size, hashlib.sha1(f.read()).hexdigest()]
+    newManifest[key] = {'files' : stamps, 'data' : None}
+
+    #Only the content matters, a touched file with the same hash keeps the cached namespace
+    if 'data' in entry and {k : v[2] for k, v in stamps.items()} == {k : v[2] for k, v in oldStamps.items()}:
+        newManifest[key]['data'] = entry['data']
+        return entry['data']
+    return None
+
+def _indexProject(path):
+    """Walks the directory tree under path once with os.scandir, in the same top down order as os.walk.
+    Returns a dictionary:
+    {
+        'dirs' : [] - every directory in walk order, a subtree is always a contiguous slice
+        'pos' : {} - directory to its position in dirs
+        'files' : {} - directory to the list of names of the files with BR_EXTENSIONS in it
+    }"""
+    index = {
+        'dirs' : [],
+        'pos' : {},
+        'files' : {}
+    }
+    stack = [path]
+    while stack:
+        directory = stack.pop()
+        files = []
+        subDirs = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    #Same as os.walk, symlinks to directories are not followed so a link cycle cant loop forever
+                    if entry.is_dir(follow_symlinks=False):
+                        subDirs.append(entry.path)
+                    elif entry.name.endswith(BR_EXTENSIONS) and not entry.is_dir():
+                        files.append(entry.name)
+        except OSError:
+            #Same as os.walk, unreadable directories are skipped
+            continue
+        index['pos'][directory] = len(index['dirs'])
+        index['dirs'].append(directory)
+        index['files'][directory] = files
+        stack.extend(reversed(subDirs))
+    return index
+
+def _subtree(index, root):
+    """Yields root and every directory under it from the index"""
+    if root not in index['pos']:
+        return
+    prefix = root + os.sep
+    for directory in index['dirs'][index['pos'][root]:]:
+        if directory != root and not directory.startswith(prefix):
+            break
+        yield directory
+
+def _nsFiles(index, root):
+    """Returns a dictionary of the files a namespace parser reads from the subtree of root:
+    {
+        'fun' : path to .fun file or None,
+        'varFiles' : [],
+        'typFiles' : [],
+        'codeFiles' : []
+    }"""
+    files = {
+        'fun' : None,
+        'varFiles' : [],
+        'typFiles' : [],
+        'codeFiles' : []
+    }
+    for directory in _subtree(index, root):
+        for file in index['files'][directory]:
+            fpath = os.path.join(directory, file)
+            ext = os.path.splitext(file)[1]
+            if ext == '.var':
+                files['varFiles'].append(fpath)
+            elif ext in ('.st', '.ab', '.c'):
+                files['codeFiles'].append(fpath)
+            elif ext == '.typ':
+                files['typFiles'].append(fpath)
+            elif ext == '.fun':
+                files['fun'] = fpath
+    return files
+
+def _parseNs(path, files=None):
     """
     This function parses every file under and around the .lby or .prg file and returns a list of lists holding dictionaries.
+    files is the result of _nsFiles for the folder of the file, the folder is indexed here if it is not given.
     0 - Function blocks
     1 - Functions
     2 - Data types
@@ -118,22 +261,10 @@ def _parseNs(path):
         'lby'  : path,
         'prg'  : path
     }
-    paths['fun'] = None
     paths['pkg'] = os.path.join(os.path.dirname(os.path.dirname(path)), 'Package.pkg')
-    paths['varFiles'] = set()
-    paths['typFiles'] = set()
-    paths['codeFiles'] = set()
-    for root, _, files in os.walk(paths.get('root')):
-        for file in files:
-            fpath = os.path.join(root, file)
-            if os.path.splitext(os.path.basename(fpath))[1] == '.var':
-                paths['varFiles'].add(fpath)
-            elif os.path.splitext(os.path.basename(fpath))[1] in ['.st', '.ab', '.c']:
-                paths['codeFiles'].add(fpath)
-            elif os.path.splitext(os.path.basename(fpath))[1] == '.typ':
-                paths['typFiles'].add(fpath)
-            elif os.path.splitext(os.path.basename(fpath))[1] == '.fun':
-                paths['fun'] = fpath
+    if files == None:
+        files = _nsFiles(_indexProject(paths.get('root')), paths.get('root'))
+    paths.update(files)
 
     #Load this libraries data
     #Get data from the upper level Package.pkg
@@ -155,15 +286,19 @@ def _parseNs(path):
         data['version'] = '1.0-0'
         data['dependencies'] = []
 
+    #Every code file is read and tokenized once and shared by all POUs of this namespace
+    if paths.get('fun') != None or data.get('type') == 'Program namespace':
+        sources = _indexSources(paths.get('codeFiles'), data.get('type') == 'Program namespace')
+
     #Parse functions and function blocks from .fun file and assemble their source code
     if paths.get('fun') != None:
-        data['fbs'], data['fcs'] = _parseFun(paths.get('fun'), paths.get('codeFiles'))
+        data['fbs'], data['fcs'] = _parseFun(paths.get('fun'), sources)
     else:
         data['fbs'], data['fcs'] = [], []
 
     #Programs apear only in program namespaces and not in libraries
     if data.get('type') == 'Program namespace':
-        data['prgs'] = [_parsePrg(paths.get('prg'), paths.get('varFiles'), paths.get('codeFiles'))]
+        data['prgs'] = [_parsePrg(paths.get('prg'), paths.get('varFiles'), sources)]
     else:
         data['prgs'] = []
 
@@ -175,8 +310,30 @@ def _parseNs(path):
 
     return data
 
-def _parsegNs(path, ignoredNs=()):
-    """Parses the project and assembles all fbs, fcs, dts, class and prgs that are not located in the same folder as a lby file. Everything that is not in a library is considered as a global"""
+def _gNsFiles(index):
+    """Returns a dictionary with lists of the .var and .typ files of the global namespace, the files that are not in a folder
+    of a .lby or .prg file or under it"""
+    paths = {
+        'var' : [],
+        'typ' : []
+    }
+    nsRoot = None
+    for root in index['dirs']:
+        #Directories are in walk order so everything under a namespace folder directly follows it
+        if nsRoot != None and root.startswith(nsRoot + os.sep):
+            continue
+        nsRoot = None
+        files = index['files'][root]
+        if any(fi.endswith(('.lby', '.prg')) for fi in files):
+            nsRoot = root
+            continue
+        paths['var'].extend(os.path.join(root, fi) for fi in files if fi.endswith('.var'))
+        paths['typ'].extend(os.path.join(root, fi) for fi in files if fi.endswith('.typ'))
+    return paths
+
+def _parsegNs(path, ignoredNs=(), index=None):
+    """Parses the project and assembles all fbs, fcs, dts, class and prgs that are not located in the same folder as a lby file. Everything that is not in a library is considered as a global.
+    index is the result of _indexProject for path, the folder is indexed here if it is not given"""
     data = {
         'name': 'Global',
         'type':'Library',
@@ -189,26 +346,11 @@ def _parsegNs(path, ignoredNs=()):
     #Determine paths to interesting files
     #PRGS cannot be global in B&R
     #FUN cannot be global in B&R
-    #Typ files that are not next to .lby or .prg files
-    #Var files that are not next to a .prg or .lby
-    paths = {
-        'var' : [],
-        'typ' : []
-    }
-    for root, _, files in os.walk(path):
-        files = (fi for fi in files if fi.endswith('.var'))
-        for file in files:
-            filepath = os.path.join(root, file)
-            lbyIecFiles = (fi for fi in os.listdir(os.path.dirname(filepath)) if fi.endswith('.lby') or fi.endswith('.prg'))
-            if not lbyIecFiles:
-                paths['var'].append(filepath)
-    for root, _, files in os.walk(os.path.dirname(path)):
-        files = (fi for fi in files if fi.endswith('.typ'))
-        for file in files:
-            filepath = os.path.join(root, file)
-            lbyIecFiles = (fi for fi in os.listdir(os.path.dirname(filepath)) if fi.endswith('.lby') or fi.endswith('.prg'))
-            if not lbyIecFiles:
-                paths['typ'].append(filepath)
+    #Typ files that are not in a folder of a .lby or .prg file or under it
+    #Var files that are not in a folder of a .lby or .prg file or under it
+    if index == None:
+        index = _indexProject(path)
+    paths = _gNsFiles(index)
 
     #Load this libraries data
     #Get data from the upper level Package.pkg
@@ -222,7 +364,7 @@ def _parsegNs(path, ignoredNs=()):
 
     return data
     
-def _parsePrg(path, varFiles, codeFiles):
+def _parsePrg(path, varFiles, sources):
     """
     This function parses the given .prg file and assembles the PRG POU in dictionary format.
     0 - Init cycle code
@@ -242,233 +384,164 @@ def _parsePrg(path, varFiles, codeFiles):
     data['if'] = []
     for varFile in varFiles:
         with open(varFile, 'r') as f:
-            data['if'].extend(_parseInterface(f.read()))
+            data['if'].extend(parseInterface(f.read()))
 
     #Find the source code of this program
-    data['code'], data['actions'] = _findSourceCode(data.get('name'), data.get('type'), codeFiles)
+    data['code'], data['actions'] = _findSourceCode(data.get('name'), data.get('type'), sources)
 
     return data
 
-def _findSourceCode(name, pou_type, codeFiles):
-    """Goes through give code files '.ab', '.st', '.c' and returns a tuple holding
+def _indexSources(codeFiles, program=False):
+    """Reads every code file '.ab', '.st', '.c' of a namespace once and returns a dictionary shared by all its POUs:
+    {
+        'pous' : {} - FB and FC name to its main code, the first implementation found wins
+        'actions' : {} - action name to a list of action dictionaries with that name, in file order
+        'prg' : [] - only if program is True, a list per file of (rx, code) matches of the program init, cyclic and exit code
+    }"""
+    sources = {
+        'pous' : {},
+        'actions' : {},
+        'prg' : []
+    }
+    for codeFile in codeFiles:
+        with open(codeFile, 'r') as f:
+            data = f.read()
+
+        if program:
+            fileMatches = []
+            for rx in (RX_PRG_ST_CYCLIC, RX_PRG_ST_INIT, RX_PRG_ST_EXIT, RX_PRG_C_CYCLIC, RX_PRG_C_INIT, RX_PRG_C_EXIT):
+                match = rx.search(data)
+                if match:
+                    fileMatches.append((rx, match.group('Code')))
+            sources['prg'].append(fileMatches)
+
+        #Find all pou implementations. In case there are multiple per file
+        if codeFile.endswith(('.st', '.ab')):
+            for pouBlock in RX_POU_ST_IDENT.finditer(data):
+                sources['pous'].setdefault(pouBlock.group('Name'), pouBlock.group('Code'))
+        elif codeFile.endswith('.c'):
+            for pouBlock in RX_POU_C_IDENT.finditer(data):
+                sources['pous'].setdefault(pouBlock.group('Name'), pouBlock.group('Code'))
+
+        #Actions supported only or ST and AB
+        if codeFile.endswith(('.st', '.ab')):
+            for actionData in RX_ACTION_IDENT.finditer(data):
+                action = {
+                    'name' : actionData.group('Name'),
+                    'code' : actionData.group('Code')
+                }
+                sources['actions'].setdefault(action['name'], []).append(action)
+    return sources
+
+def _findSourceCode(name, pou_type, sources):
+    """Looks up the POU in the sources index made by _indexSources and returns a tuple holding
     the main source code of the pou and a list of actions"""
 
     mainCode = None
     actions = []
     if pou_type == 'Program':
         #Find cyclic, init and exit code
-        for codeFile in codeFiles:
-            with open(codeFile, 'r') as f:
-                data = f.read()
-                for rx in (RX_PRG_ST_CYCLIC, RX_PRG_ST_INIT, RX_PRG_ST_EXIT, RX_PRG_C_CYCLIC, RX_PRG_C_INIT, RX_PRG_C_EXIT):
-                    match = re.search(rx, data, re.S)
-                    if match:
-                        if rx in (RX_PRG_ST_CYCLIC, RX_PRG_C_CYCLIC):
-                            mainCode = match.group('Code')
-
-                        elif rx in (RX_PRG_ST_INIT, RX_PRG_C_INIT):
-                            actions.append({
-                                'name' : 'Init',
-                                'code' : match.group('Code')
-                            })
-
-                        elif rx in (RX_PRG_ST_EXIT, RX_PRG_C_EXIT):
-                            actions.append({
-                                'name' : 'Exit',
-                                'code' : match.group('Code')
-                            })
+        for fileMatches in sources['prg']:
+            for rx, code in fileMatches:
+                if rx in (RX_PRG_ST_CYCLIC, RX_PRG_C_CYCLIC):
+                    mainCode = code
+
+                elif rx in (RX_PRG_ST_INIT, RX_PRG_C_INIT):
+                    actions.append({
+                        'name' : 'Init',
+                        'code' : code
+                    })
+
+                elif rx in (RX_PRG_ST_EXIT, RX_PRG_C_EXIT):
+                    actions.append({
+                        'name' : 'Exit',
+                        'code' : code
+                    })
             if mainCode != None and len(actions) >= 2:
                 break
 
     elif pou_type in ('Function block', 'Function'):
         #Find the main source code
-        for codeFile in codeFiles:
-            with open(codeFile, 'r') as f:
-                data = f.read()
-
-            if codeFile.endswith(('.st', '.ab')):
-                #Find all pou implementations. In case there are multiple per file
-                for pouBlock in re.finditer(RX_POU_ST_IDENT, data, re.S):
-                    if pouBlock.group('Name') == name:
-                        mainCode = pouBlock.group('Code')
-                        break
-
-            elif codeFile.endswith('.c'):
-                #Find all pou implementations. In case there are multiple per file
-                for pouBlock in re.finditer(RX_POU_C_IDENT, data, re.S):
-                    if pouBlock.group('Name') == name:
-                        mainCode = pouBlock.group('Code')
-                        break
-            if mainCode != None:
-                break
+        mainCode = sources['pous'].get(name)
     
     #Main code must exist at this point of the parse
     if mainCode == None:
         raise Exception
     
     #Find any actions that belong to this POU
-    #First parse all actions to a temporary list
-    actionIdents = []
-    for codeFile in codeFiles:
-        #Actions supported only or ST and AB
-        if codeFile.endswith(('.st', '.ab')):
-            with open(codeFile, 'r') as f:
-                data = f.read()
-                for actionData in re.finditer(RX_ACTION_IDENT, data, re.S):
-                    action = {
-                        'name' : actionData.group('Name'),
-                        'code' : actionData.group('Code')
-                    }
-                    actionIdents.append(action)
+    actionIdents = sources['actions']
 
     #If no actions found, return
     if not actionIdents:
         return mainCode, actions
 
-    #Search through the main code of the pou and if action called matches the name of an action
-    # append the action
-    for actionCandidate in re.finditer(RX_ACTION_CANDIDATE, mainCode, re.S):
-        for action in actionIdents:
-            if actionCandidate.group('ActionName') == action.get('name'):
+    #Breadth first walk of the action calls starting from the main code, init and exit code.
+    #Every action name is resolved once, calls between the actions are kept in graph to report cycles
+    graph = {}
+    visited = set()
+    queue = deque([(None, mainCode)] + [(None, action.get('code')) for action in actions])
+    while queue:
+        caller, code = queue.popleft()
+        for actionCandidate in RX_ACTION_CANDIDATE.finditer(code):
+            actionName = actionCandidate.group('ActionName')
+            if actionName not in actionIdents:
+                continue
+            if caller != None:
+                graph[caller].append(actionName)
+            if actionName in visited:
+                continue
+            visited.add(actionName)
+            graph[actionName] = []
+            for action in actionIdents[actionName]:
                 actions.append(action)
-    
-    #Search through the actions to find other action calls. The new actions get added to the
-    #end of the list so they get searched too. Recursive action calling is not allowed in IEC
-    #but if someone does that, this program will maybe fail or create duplicated data
-    for action in actions:
-        for actionCandidate in re.finditer(RX_ACTION_CANDIDATE, action.get('code'), re.S):
-            for actionSrc in actionIdents:
-                if actionCandidate.group('ActionName') == actionSrc.get('name'):
-                    actions.append(actionSrc)
+                queue.append((actionName, action.get('code')))
+
+    #Recursive action calling is not allowed in IEC, the actions are still returned once each
+    cycles = _findCycles(graph)
+    if cycles:
+        warnings.warn(f"{pou_type} {name} has recursive action calls: {'; '.join(' -> '.join(cycle) for cycle in cycles)}")
 
     return mainCode, actions
 
-def _parseInterface(interfaceData):
-    """Parses a string and returns a list of dictionary representing var blocks:
-    {
-        'name' : VAR_BLOCK,
-        'attribute' : retain,
-        'vars' : []
-    }"""
-    blocks = []
-
-    #B&R HAS ONLY VAR_INPUT, VAR_INPUT RETAIN, VAR_OUTPUT, VAR_OUTPUT RETAIN, VAR_IN_OUT, VAR CONSTANT, VAR RETAIN
-    for varIdentRx in RX_VAR_IDENTS:
-        #First find all VAR - END VAR blocks
-        for var_block in re.finditer(varIdentRx, interfaceData, re.S):
-            block = {
-                'name' : '',
-                'attribute' : var_block.group('Attribute') if var_block.group('Attribute') != None else '',
-                'vars' : []
-            }
-            if varIdentRx.startswith('VAR_INPUT'):
-                block['name'] = 'VAR_INPUT'
-            elif varIdentRx.startswith('VAR_OUTPUT'):
-                block['name'] = 'VAR_OUTPUT'
-            elif varIdentRx.startswith('VAR_IN_OUT'):
-                block['name'] = 'VAR_IN_OUT'
-            elif varIdentRx.startswith(r'\bVAR'):
-                block['name'] = 'VAR'
-                
-            #For each VAR - END_VAR block, parse all members
-            for member in re.finditer(RX_VAR_MEMBER, var_block.group('Members')):
-                var = {
-                    'name' : member.group('Name'),
-                    'type' : member.group('Type'),
-                    'initialValue' : member.group('Initial') if member.group('Initial') != None else '',
-                    'description' : member.group('Desc1') if member.group('Desc1') != None else '',
-                    'attribute' : var_block.group('Attribute') if var_block.group('Attribute') != None else ''
-                }
-                block['vars'].append(var)
-            blocks.append(block)
-    return blocks
+def _findCycles(graph):
+    """Returns a list of cycles in a call graph of name to list of called names. Each cycle is a list of names
+    starting and ending with the same name. Iterative depth first search so deep call chains dont hit the recursion limit"""
+    cycles = []
+    #Names on the current path map to their position in it, done names are never entered again
+    onPath = {}
+    path = []
+    done = set()
+    for start in graph:
+        if start in done:
+            continue
+        stack = [(start, iter(graph[start]))]
+        onPath[start] = 0
+        path.append(start)
+        while stack:
+            node, callees = stack[-1]
+            callee = next(callees, None)
+            if callee == None:
+                stack.pop()
+                path.pop()
+                del onPath[node]
+                done.add(node)
+            elif callee in onPath:
+                cycles.append(path[onPath[callee]:] + [callee])
+            elif callee not in done:
+                onPath[callee] = len(path)
+                path.append(callee)
+                stack.append((callee, iter(graph[callee])))
+    return cycles
 
 def _parseDts(typFiles):
-    """Returns a list of data types(Structs) in dictionary format"""
-    dts= []
-    
+    """Returns a list of data types(Structs and enumerations) in dictionary format"""
+    dts = []
     for file in typFiles:
-        #Parse the file
-        with open(file, 'r') as file:
-            sourceCode = file.read()
-        
-        #Parse from all TYPE -> END_TYPE
-        for typ in re.finditer(RX_TYP_IDENT, sourceCode, re.S):
-            #Split text belonging to structs and enumerations to simplify code
-            structLines = []
-            enumLines = []
-            inStruct = False
-            inEnum = False
-            for line in typ.group('StructData').splitlines():
-                if re.match(RX_STRUCT_START, line):
-                    inStruct = True
-                    structLines.append(line)
-                elif re.match(RX_STRUCT_END, line):
-                    inStruct = False
-                    structLines.append(line)
-                elif inStruct:
-                    structLines.append(line)
-
-                if not inStruct:
-                    if re.match(RX_ENUM_START, line):
-                        inEnum = True
-                        enumLines.append(line)
-                    elif re.search(RX_ENUM_END, line, re.M):
-                        inEnum = False
-                        enumLines.append(line)
-                    elif inEnum:
-                        enumLines.append(line)
-            enumTxt = '\n'.join(enumLines)
-            structTxt = '\n'.join(structLines)
-
-            #Parse from all STRUCT -> END_STRUCT
-            for match in re.finditer(RX_STRUCT_IDENT, structTxt, re.S):
-                dt = {}
-                dt['baseType'] = 'struct'
-                dt['name'] = match.group('Name')
-                dt['redund'] = match.group('Redund')
-                dt['description'] = match.group('Desc1') if match.group('Desc1') != None else ''
-                dt['field1'] = match.group('Desc2') if match.group('Desc2') != None else ''
-                dt['field2'] = match.group('Desc3') if match.group('Desc3') != None else ''
-            
-                dt['components'] = []
-                for cpt in re.finditer(RX_VAR_MEMBER, match.group('Data'), re.S):
-                    var = {}
-                    var['name'] = cpt.group('Name')
-                    var['type'] = cpt.group('Type')
-                    var['attribute'] = cpt.group('Redund')
-                    var['initialValue'] = cpt.group('Initial') if cpt.group('Initial') != None else ''
-                    var['description'] = cpt.group('Desc1') if cpt.group('Desc1') != None else ''
-                    var['field1'] = cpt.group('Desc2') if cpt.group('Desc2') != None else ''
-                    var['field2'] = cpt.group('Desc3') if cpt.group('Desc3') != None else ''
-                    dt['components'].append(var)
-                dts.append(dt)
-            #Parse from enumeration
-            for match in re.finditer(RX_ENUM_IDENT, enumTxt, re.S):
-                dt = {}
-                dt['name'] = match.group('Name')
-                dt['baseType'] = 'enumeration'
-                dt['components'] = []
-                dt['description'] = match.group('Desc1') if match.group('Desc1') != None else ''
-                dt['field1'] = match.group('Desc2') if match.group('Desc2') != None else ''
-                dt['field2'] = match.group('Desc3') if match.group('Desc3') != None else ''
-                dt['initialValue'] = match.group('Initial') if match.group('Initial') != None else ''
-                
-                dt['components'] = []
-                for cpt in re.finditer(RX_ENUM_VAR, match.group('Data'), re.S):
-                    var = {}
-                    var['name'] = cpt.group('VarName')
-                    var['type'] = ''
-                    var['attribute'] = ''
-                    var['initialValue'] = cpt.group('Initial') if cpt.group('Initial') != None else ''
-                    var['description'] = cpt.group('Desc1') if cpt.group('Desc1') != None else ''
-                    var['field1'] = cpt.group('Desc2') if cpt.group('Desc2') != None else ''
-                    var['field2'] = cpt.group('Desc3') if cpt.group('Desc3') != None else ''
-                    dt['components'].append(var)
-                dts.append(dt)        
+        with open(file, 'r') as f:
+            dts.extend(parseTypes(f.read()))
     return dts
 
-def _parseFun(funFilePath, codeFiles):
+def _parseFun(funFilePath, sources):
     """Returns a tuple with lists of function blocks and functions as dictionaries"""
     fbs = []
     fcs = []
@@ -478,21 +551,21 @@ def _parseFun(funFilePath, codeFiles):
         data = file.read()
 
     #Check if data has function blocks
-    for fbBlock in re.finditer(RX_FB_IDENT, data, re.S):
+    for fbBlock in RX_FB_IDENT.finditer(data):
         fbd = {
             'name' : fbBlock.group('Name'),
             'type' : 'Function block'
             }
 
         #Parse the interface
-        fbd['if'] = _parseInterface(fbBlock.group('Interface'))
+        fbd['if'] = parseInterface(fbBlock.group('Interface'))
 
         #Find the source code of this function block
-        fbd['code'], fbd['actions'] = _findSourceCode(fbd.get('name'), fbd.get('type'),  codeFiles)
+        fbd['code'], fbd['actions'] = _findSourceCode(fbd.get('name'), fbd.get('type'), sources)
         fbs.append(fbd)
 
     #Check if data has functions
-    for fcBlock in re.finditer(RX_FC_IDENT, data, re.S):
+    for fcBlock in RX_FC_IDENT.finditer(data):
         fcd = {
             'name' : fcBlock.group('Name'),
             'type' : 'Function',
@@ -500,9 +573,9 @@ def _parseFun(funFilePath, codeFiles):
         }
         
         #Parse the interface
-        fcd['if'] = _parseInterface(fcBlock.group('Interface'))
+        fcd['if'] = parseInterface(fcBlock.group('Interface'))
         
         #Find the source code of this function
-        fcd['code'], fcd['actions'] = _findSourceCode(fcd.get('name'), fcd.get('type'),  codeFiles)
+        fcd['code'], fcd['actions'] = _findSourceCode(fcd.get('name'), fcd.get('type'), sources)
         fcs.append(fcd)
     return fbs, fcs
\ No newline at end of file
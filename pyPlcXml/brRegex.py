@@ -0,0 +1,25 @@
+import re
+
+#Precompiled patterns of the B&R code files and .fun declarations used by brParser, variable and type declarations are parsed by stParser.
+#Every pattern is compiled once at import with the flags it is used with, so the parsers never go through the re cache.
+
+#Program code in .st and .c files
+RX_PRG_ST_CYCLIC = re.compile(r'(PROGRAM _CYCLIC)(?P<Code>.*?)(END_PROGRAM)', re.S)
+RX_PRG_ST_INIT = re.compile(r'(PROGRAM _INIT)(?P<Code>.*?)(END_PROGRAM)', re.S)
+RX_PRG_ST_EXIT = re.compile(r'(PROGRAM _EXIT)(?P<Code>.*?)(END_PROGRAM)', re.S)
+RX_PRG_C_CYCLIC = re.compile(r'void\s+_CYCLIC\s+(.*?)\(.*?\)\s*{(?P<Code>.*)}', re.S)
+RX_PRG_C_INIT = re.compile(r'void\s+_INIT\s+(.*?)\(.*?\)\s*{(?P<Code>.*)}', re.S)
+RX_PRG_C_EXIT = re.compile(r'void\s+_EXIT\s+(.*?)\(.*?\)\s*{(?P<Code>.*)}', re.S)
+
+#Function and function block implementations
+RX_POU_ST_IDENT = re.compile(r'(FUNCTION_BLOCK|FUNCTION)\s+(?P<Name>\w+)\s(?P<Code>.*?)(END_FUNCTION_BLOCK|END_FUNCTION)', re.S)
+RX_POU_C_IDENT = re.compile(r'(?P<ReturnType>void)\s+(?P<Name>.*?)\s*?(?P<Parameters>\(.*?\))\s*{(?P<Code>.+?)}', re.S)
+
+#Function and function block declarations in .fun files. The match starts at the redundancy attribute or the keyword
+#instead of at every whitespace before them
+RX_FB_IDENT = re.compile(r'(?:({REDUND_(OK|ERROR)})\s*)?FUNCTION_BLOCK\s+(?P<Name>.*?)\s+(?P<Interface>.*?)END_FUNCTION_BLOCK', re.S)
+RX_FC_IDENT = re.compile(r'(?:({REDUND_(OK|ERROR)})\s*)?\bFUNCTION\s+(?P<Name>.*?)\s*:\s*(?P<ReturnType>.*?)\s(?P<Interface>.*?)\bEND_FUNCTION', re.S)
+
+#Actions and action calls
+RX_ACTION_IDENT = re.compile(r'ACTION\s(?P<Name>.*?):(?P<Code>.*?)END_ACTION', re.S)
+RX_ACTION_CANDIDATE = re.compile(r'(?<!:=)\s(?P<ActionName>[A-Za-z0-9_]*);', re.S)
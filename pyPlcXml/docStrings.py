@@ -0,0 +1,97 @@
+import os, re
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import chain, repeat
+
+#Extraction of documentation comments from code bodies for documentation generators.
+#A docstring pattern is a regex with a DocString group, patterns are compiled once and cached. The comment markers are stripped
+#from a docstring in one regex pass, every marker has a star so docstrings without one are kept as they are.
+#attachDocStrings stores the docstrings of every POU, action and method in its 'docStrings' key, or the docStrings field
+#of a pyPlcXml.Pou, so the documentation is part of the project.
+
+#Comments that start with (** are docstrings, the group holds the text between the markers so most docstrings need no cleaning
+DOC_RX = r'\(\*\*+ ?(?P<DocString>.*?)\*+\)'
+
+#Comment openers with their stars and one space, closers with their stars and runs of stars
+RX_COMMENT_MARKS = re.compile(r'\(\*+ ?|\*+\)|\*\*+')
+
+#Namespace lists with POUs, classes of a model are in Namespace.classes
+POU_CATEGORIES = ('prgs', 'fbs', 'fcs', 'class')
+MODEL_CATEGORIES = ('prgs', 'fbs', 'fcs', 'classes')
+
+#Bodies per task of a worker process, small chunks are not worth the pickling
+_CHUNK_SIZE = 256
+
+def extractDocStrings(code, docRx=DOC_RX):
+    """Returns a list of the docstrings in code without comment markers.
+    docRx is a regex string or compiled pattern with a DocString group, strings are compiled with re.DOTALL"""
+    if not code:
+        return []
+    pattern = _compile(docRx)
+    if pattern.groups == 1:
+        docStrings = pattern.findall(code)
+    else:
+        docStrings = [match.group('DocString') for match in pattern.finditer(code)]
+    return [cleanDocString(docString) if '*' in docString else docString for docString in docStrings]
+
+def cleanDocString(txt):
+    """Returns txt without the comment markers (* *) (** **) and runs of stars"""
+    return RX_COMMENT_MARKS.sub('', txt)
+
+def attachDocStrings(data, docRx=DOC_RX, workers=None):
+    """Extracts the docstrings of every POU, action and method of a project and stores them as a list in its 'docStrings' key.
+    data is a parse result, a dictionary or a pyPlcXml.Project, Pou models get them in their docStrings field. Returns data.
+        workers : int - number of processes that extract in parallel, worth it for projects with thousands of bodies.
+            docRx must be picklable, a string or compiled pattern"""
+    bodies = list(_bodies(data))
+    codes = [_code(body) for body in bodies]
+    workers = min(workers or 1, os.cpu_count() or 1)
+    if workers > 1 and len(codes) > _CHUNK_SIZE:
+        chunks = [codes[i:i + _CHUNK_SIZE] for i in range(0, len(codes), _CHUNK_SIZE)]
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            docStrings = chain.from_iterable(executor.map(_extractChunk, chunks, repeat(docRx)))
+            for body, bodyDocStrings in zip(bodies, docStrings):
+                _attach(body, bodyDocStrings)
+    else:
+        for body, code in zip(bodies, codes):
+            _attach(body, extractDocStrings(code, docRx))
+    return data
+
+@lru_cache(maxsize=64)
+def _compile(docRx):
+    if isinstance(docRx, re.Pattern):
+        pattern = docRx
+    else:
+        pattern = re.compile(docRx, re.DOTALL)
+    if 'DocString' not in pattern.groupindex:
+        raise ValueError(f'Docstring pattern {pattern.pattern} has no DocString group')
+    return pattern
+
+def _extractChunk(codes, docRx):
+    return [extractDocStrings(code, docRx) for code in codes]
+
+def _bodies(data):
+    """Yields every POU with its actions and methods, dictionaries or models"""
+    if isinstance(data, dict):
+        for namespace in data.get('namespaces', []):
+            for category in POU_CATEGORIES:
+                for pou in namespace.get(category) or []:
+                    yield pou
+                    yield from pou.get('actions') or []
+                    yield from pou.get('methods') or []
+    else:
+        for namespace in data.namespaces or []:
+            for category in MODEL_CATEGORIES:
+                for pou in getattr(namespace, category) or []:
+                    yield pou
+                    yield from pou.actions or []
+                    yield from pou.methods or []
+
+def _code(body):
+    return body.get('code') if isinstance(body, dict) else body.code
+
+def _attach(body, docStrings):
+    if isinstance(body, dict):
+        body['docStrings'] = docStrings
+    else:
+        body.set('docStrings', docStrings)
@@ -1,5 +1,8 @@
 import re
 from enum import Enum
+from lxml import etree
+from .docStrings import extractDocStrings, cleanDocString
+from .codeMetrics import lineMetrics
 
 #define constants
 ns = {
@@ -16,16 +19,55 @@ class file_type(Enum):
     iec61131_10 = 3
     bnr = 4
     prepped = 5
+    binary = 6
+    jsonl = 7
+
+#Root element namespace of every supported xml format with its file type and schema
+xmlFormats = {
+    r"http://www.plcopen.org/xml/tc6_0201" : (file_type.tc6v201, 'tc6_xml_v201.xsd'),
+    r"http://www.plcopen.org/xml/tc6_0200" : (file_type.tc6v200, 'tc6_xml_v200.xsd'),
+    r"www.iec.ch/public/TC65SC65BWG7TF10" : (file_type.iec61131_10, 'IEC61131_10_Ed1_0.xsd')
+}
+
+def _nsMap(uri):
+    """Returns a new namespace map where 'ns' points to the given namespace. Parsers use their own map
+    instead of changing the shared ns so parses of different formats can run at the same time"""
+    return dict(ns, ns=uri)
+
+def _xmlParser():
+    """Returns a new lxml parser for PLC xml exports. Comments and processing instructions are dropped
+    so iterating over a node yields only elements. Parsers are not shared between threads so a new one is made per call"""
+    return etree.XMLParser(remove_comments=True, remove_pis=True, huge_tree=True, resolve_entities=False)
+
+def _getRoot(source, stripAddData=False):
+    """Returns the root element of source. Source can be a path to a xml file, an already parsed tree or an element.
+    With stripAddData a file is parsed without the vendor addData that the TC6 parsers dont read"""
+    if isinstance(source, etree._ElementTree):
+        return source.getroot()
+    if isinstance(source, etree._Element):
+        return source
+    if stripAddData:
+        return _parseStripped(source)
+    return etree.parse(source, _xmlParser()).getroot()
+
+def _sniffXml(pathToXml, chunkSize=4096):
+    """Reads the file in small chunks only until the root element is seen and returns the namespace of the root element.
+    Cost doesnt depend on the file size. Returns None if the file has no root element"""
+    parser = etree.XMLPullParser(events=('start',), resolve_entities=False)
+    with open(pathToXml, 'rb') as f:
+        chunk = f.read(chunkSize)
+        while chunk:
+            parser.feed(chunk)
+            for _, element in parser.read_events():
+                return etree.QName(element).namespace
+            chunk = f.read(chunkSize)
+    return None
 
 def _cleanLine(txt):
-    unwanted = ('(***', '***)', '(* ', '(*', '*)','**')
-    for thing in unwanted:
-        txt = txt.replace(thing, "")
-    return txt
+    return cleanDocString(txt)
 
 def _extractDocStrings(code, docRx):
-    matches = re.compile(docRx, flags=re.DOTALL).finditer(code)
-    return [_cleanLine(match.group('DocString')) for match in matches]
+    return extractDocStrings(code, docRx)
 
 def _findVar(var, text):
     """
@@ -42,46 +84,37 @@ def _findVar(var, text):
     return False
 
 def _countLines(txt):
-    '''Counts lines of code, comments not including empty lines and total lines'''
-    splitLines = txt.splitlines()
-    totalLines = len(splitLines)
-    codeLines = totalLines
-    commentLines = 0
-    i = 0
-    while i < totalLines:
-        line = splitLines[i]
-        trimmedLine = line.replace(' ', '').replace('\t', '')
+    '''Counts lines of code, comments not including empty lines and total lines.
+    Uses the comment scanner of codeMetrics.lineMetrics, so nested comments and comments followed by code are counted the same way'''
+    metrics = lineMetrics(txt)
+    return(metrics['code'], metrics['comment'], metrics['total'])
 
-        if trimmedLine == '':
-            #Empty line
-            codeLines -= 1
-        elif trimmedLine.startswith('//'):
-            #Single line comment
-            commentLines += 1
-            codeLines -= 1
-        elif trimmedLine.startswith('(*'):
-            #Single or multicomment
-            if '*)' in trimmedLine:
-                commentLines += 1
-                codeLines -= 1
-                i += 1
-                continue
-            #Find where the end of comment is
-            comm_start = i
-            i += 1
-            while '*)' not in splitLines[i]:
-                i += 1
-            comm_end = i
-            commentLines += (comm_end - comm_start + 1)
-            codeLines -= (comm_end - comm_start + 1)
-        i += 1
-    return(codeLines, commentLines, totalLines)
+#Children of vendor addData/data elements that the TC6 parsers read: CODESYS methods and variable attributes,
+#POUs and data types of resources and TwinCat resources. Other vendor data is dropped by _parseStripped
+ADD_DATA_KEEP = frozenset(('Method', 'Attributes', 'pou', 'dataType', 'resource'))
 
 def removeAddData(node):
-    """Removes all nodes with addData tag"""
-    for child in list(node):
-        if child.tag == '{http://www.plcopen.org/xml/tc6_0200}addData':
-            node.remove(child)
-        else:
-            removeAddData(child)
-    return
\ No newline at end of file
+    """Removes all nodes with addData tag of TC6 v200 and v201 files, or of any other namespace.
+    Works without recursion so deeply nested vendor data cant hit the recursion limit"""
+    for addData in list(node.iter('{*}addData')):
+        parent = addData.getparent()
+        if parent is not None:
+            parent.remove(addData)
+
+def _parseStripped(source):
+    """Parses a TC6 xml file and returns its root element without the vendor addData that the parsers dont read.
+    Every addData/data element is checked as soon as it is complete and dropped, so the subtrees of the whole document
+    are never in memory at the same time"""
+    context = etree.iterparse(source, events=('end',), tag=('{*}data', '{*}addData'),
+        remove_comments=True, remove_pis=True, huge_tree=True, resolve_entities=False)
+    for _, elem in context:
+        parent = elem.getparent()
+        if parent is None:
+            continue
+        if etree.QName(elem).localname == 'data':
+            if etree.QName(parent).localname == 'addData' and not any(etree.QName(child).localname in ADD_DATA_KEEP for child in elem):
+                parent.remove(elem)
+        elif len(elem) == 0:
+            #addData without any data that is read
+            parent.remove(elem)
+    return context.root
@@ -0,0 +1,76 @@
+import json
+
+#JSON Lines format of parsed projects, one JSON object per line:
+#   {"ns": null, "kind": "info", "item": {...}} - project information
+#   {"ns": "MyNs", "kind": "namespace", "item": {...}} - fields of a namespace that are not lists of items, lists are empty
+#   {"ns": "MyNs", "kind": "prgs" | "fbs" | "fcs" | "class" | "dts" | "vars" | ..., "item": {...}} - one item of a namespace list
+#Lines are written and read one at a time so a file or pipe of any size is handled in constant memory.
+
+def dumpLines(source, fp):
+    """Writes source to fp in the JSON Lines format and returns the number of lines written.
+    source is a parsed data dictionary or an iterable of (namespace name, category, item) tuples like iterTc6 and iterIec61131_10 yield,
+    a generator is consumed lazily. fp is a path or a text file object like sys.stdout"""
+    if isinstance(fp, str):
+        with open(fp, 'w', encoding='utf-8', newline='\n') as f:
+            return dumpLines(source, f)
+    if isinstance(source, dict):
+        source = _iterData(source)
+    count = 0
+    for nsName, kind, item in source:
+        fp.write(json.dumps({'ns' : nsName, 'kind' : kind, 'item' : item}, ensure_ascii=False, separators=(',', ':')))
+        fp.write('\n')
+        count += 1
+    return count
+
+def iterLines(fp):
+    """Reads a JSON Lines file written by dumpLines line by line and yields tuples of (namespace name, category, item)
+    in the same format as iterTc6 and iterIec61131_10. Namespace fields are yielded as (namespace name, 'namespace', fields).
+    fp is a path or a text file object like sys.stdin. Raises ValueError with the line number for a malformed line"""
+    if isinstance(fp, str):
+        with open(fp, encoding='utf-8') as f:
+            yield from iterLines(f)
+        return
+    for lineNumber, line in enumerate(fp, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            yield record['ns'], record['kind'], record['item']
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(f'Invalid JSON Lines record on line {lineNumber}: {e}') from None
+
+def loadLines(fp):
+    """Reads a JSON Lines file written by dumpLines and returns the data dictionary in the same format as parse.
+    Namespaces written from iterTc6 or iterIec61131_10 tuples contain only the lists that had items"""
+    data = {'namespaces' : []}
+    namespaces = {}
+    for nsName, kind, item in iterLines(fp):
+        if kind == 'info':
+            data['info'] = item
+        elif kind == 'namespace':
+            #A namespace line starts a new namespace, namespaces with the same name stay separate
+            namespace = namespaces[nsName] = item
+            data['namespaces'].append(namespace)
+        else:
+            namespace = namespaces.get(nsName)
+            if namespace == None:
+                namespace = namespaces[nsName] = {'name' : nsName}
+                data['namespaces'].append(namespace)
+            namespace.setdefault(kind, []).append(item)
+    #info comes first like in the other formats
+    return {key : data[key] for key in ('info', 'namespaces') if key in data}
+
+def _iterData(data):
+    """Yields the lines of a parsed data dictionary as (namespace name, category, item) tuples"""
+    yield None, 'info', data.get('info')
+    for namespace in data.get('namespaces', []):
+        nsName = namespace.get('name')
+        #Lists of items are written one item per line, the namespace line keeps the order of the keys
+        lists = [key for key, value in namespace.items() if _isItemList(value)]
+        yield nsName, 'namespace', {key : [] if key in lists else value for key, value in namespace.items()}
+        for key in lists:
+            for item in namespace[key]:
+                yield nsName, key, item
+
+def _isItemList(value):
+    return isinstance(value, list) and all(isinstance(item, dict) for item in value)
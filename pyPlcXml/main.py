@@ -1,49 +1,237 @@
-import pkg_resources, json, os
+import json, os, time, itertools
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, BrokenExecutor, wait, FIRST_COMPLETED
 from lxml import etree
 from .xmlParsers import tc6Parse, iec61131_10Parse
 from .brParser import brParse
-from .helpers import file_type
+from .helpers import file_type, xmlFormats, _xmlParser, _sniffXml
+from .schemaRegistry import getSchema
+from .binaryFormat import load
+from .jsonLines import loadLines
+from .models import Project
+from .parseCache import cacheKey, loadCached, storeCached, CACHE_SIZE
 
 def parse(*args, **kwargs):
-    """args[0] - path to file
+    """args[0] - path to file. .json, .jsonl, .plcx and .apj files are recognized by their extension only, never by their content.
+            .plcx files are read with load, the format is plain JSON and struct packed integers, reading it runs no code and
+            doesnt depend on the python version. A file that isnt a complete .plcx file raises ValueError
         kwargs
-            ignoredNs : list() - list of strings of namespaces to ignore"""
-    match validate(args[0]):
+            ignoredNs : list() - list of strings of namespaces to ignore
+            strict : bool - validate xml files against their schema before parsing, default False
+            workers : int - B&R projects only, number of processes that parse namespaces in parallel
+            cache : str - B&R projects only, path to a cache file for incremental parsing. Only namespaces whose files
+                changed since the last parse with the same cache are parsed again. A cache written by another version of pyPlcXml is not used
+            cacheDir : str - directory of a parse cache shared by all file types. A file with the same content, parsed with the same
+                options by the same library version is loaded from the cache instead of being parsed. Safe to share between processes.
+                Results are stored as pickles that can run code when loaded, only use a directory that untrusted users cant write to
+            cacheSize : int - size limit of cacheDir in bytes, least recently used results are removed first, default 256 MB
+            model : bool - return a pyPlcXml.Project model instead of a dictionary, it needs less memory for big projects
+            stripAddData : bool - TC6 files only, vendor addData that isnt parsed, like CODESYS object ids and plain text interfaces,
+                is dropped while the file is read so it is never kept in memory. The result is the same"""
+    cacheDir = kwargs.get('cacheDir')
+    if cacheDir == None or args[0].endswith(('.json', '.jsonl', '.plcx')):
+        data = _parse(*args, **kwargs)
+    else:
+        key = cacheKey(args[0], kwargs.get('ignoredNs', []), kwargs.get('strict', False))
+        data = loadCached(cacheDir, key)
+        if data == None:
+            data = _parse(*args, **kwargs)
+            if data != None:
+                storeCached(cacheDir, key, data, kwargs.get('cacheSize', CACHE_SIZE))
+
+    if kwargs.get('model') and data != None:
+        return Project.fromDict(data)
+    return data
+
+def _parse(*args, **kwargs):
+    """Detects the file type and parses the file with its parser, see parse"""
+    fileType, doc = _detect(args[0], kwargs.get('strict', False))
+    #Xml document is already parsed in strict mode, otherwise parsers get the path
+    source = args[0] if doc is None else doc
+    match fileType:
         case file_type.bnr:
-            return brParse(args[0], kwargs.get('ignoredNs', []))
+            return brParse(args[0], kwargs.get('ignoredNs', []), kwargs.get('workers'), kwargs.get('cache'))
         case file_type.tc6v200:
-            return tc6Parse(args[0], file_type.tc6v200, kwargs.get('ignoredNs', []))
+            return tc6Parse(source, file_type.tc6v200, kwargs.get('ignoredNs', []), kwargs.get('stripAddData', False))
         case file_type.tc6v201:
-            return tc6Parse(args[0], file_type.tc6v201, kwargs.get('ignoredNs', []))
+            return tc6Parse(source, file_type.tc6v201, kwargs.get('ignoredNs', []), kwargs.get('stripAddData', False))
         case file_type.iec61131_10:
-            return iec61131_10Parse(args[0], kwargs.get('ignoredNs', []))
+            return iec61131_10Parse(source, kwargs.get('ignoredNs', []))
         case file_type.prepped:
             with open(args[0]) as f:
                 return json.loads(f.read())
+        case file_type.binary:
+            return load(args[0])
+        case file_type.jsonl:
+            return loadLines(args[0])
     return None
-        
-def validate(pathToXml):
+
+def parseMany(paths, workers=None, backend='process', ordered=True, chunksize=1, timeout=None, **kwargs):
+    """Parses many files in parallel with parse and yields tuples of (path, result) as files finish.
+    result is the parsed data or the exception raised while parsing that file, one failing file doesnt stop the others.
+        paths : iterable of paths, it is consumed lazily
+        workers : int - number of parallel workers, default is the number of cpus
+        backend : 'process' | 'thread' - processes scale across all cores, threads avoid pickling the results
+        ordered : bool - yield results in the order of paths instead of the order they finish. Workers go on with the next files
+            while an older file is parsed, up to 2 * workers finished chunks are held back until it is done
+        chunksize : int - number of files handed to a worker at once, bigger chunks lower the overhead for many small files
+        timeout : float - seconds a file may take from when its chunk starts. A file that takes longer yields a TimeoutError
+            and the pool is replaced so the following files get free workers. Worker processes of timed out chunks are killed,
+            chunks that were running next to them are started again. Threads cant be killed, a hung thread keeps running
+            in the background and the interpreter waits for it at exit, use the process backend for files that can hang
+    A worker process that dies, for example killed by the os, breaks the pool. The chunks that were running are parsed again
+    one at a time, the files of the chunk that breaks the pool again yield a BrokenProcessPool error.
+        kwargs are passed to parse"""
+    executors = {'process' : ProcessPoolExecutor, 'thread' : ThreadPoolExecutor}
+    if backend not in executors:
+        raise ValueError(f"Unknown backend {backend}, expected one of {tuple(executors)}")
+    workers = workers or os.cpu_count()
+    paths = iter(paths)
+
+    executor = executors[backend](max_workers=workers)
+    #Chunks of paths by their position in paths
+    chunks = {}
+    positions = itertools.count()
+    #Running futures with the position of their chunk and deadline
+    pending = {}
+    #Results of finished chunks by position that wait for older chunks in ordered mode
+    finished = {}
+    nextPos = 0
+    #Positions of chunks that were running when a worker process died, they run alone to find the chunk that kills the worker
+    suspects = deque()
+    isolated = None
+
+    def submit(pos):
+        future = executor.submit(_parseChunk, chunks[pos], kwargs)
+        pending[future] = (pos, _deadline(chunks[pos], timeout))
+        return future
+
+    try:
+        while True:
+            if suspects:
+                if not pending:
+                    isolated = submit(suspects.popleft())
+            else:
+                #Only as many chunks as there are workers are handed out, every chunk starts right away on a free worker
+                #so its deadline counts from its start
+                while len(pending) < workers and len(finished) < 2 * workers:
+                    chunk = list(itertools.islice(paths, chunksize))
+                    if not chunk:
+                        break
+                    pos = next(positions)
+                    chunks[pos] = chunk
+                    submit(pos)
+            if not pending:
+                return
+
+            deadlines = [deadline for pos, deadline in pending.values() if deadline != None]
+            waitTime = max(0, min(deadlines) - time.monotonic()) if deadlines else None
+            wait(pending, timeout=waitTime, return_when=FIRST_COMPLETED)
+
+            ready = []
+            timedOut = broken = False
+            for future, (pos, deadline) in list(pending.items()):
+                if future.done():
+                    if _poolFailed(future):
+                        #A worker died, the pool is broken and every chunk that was running failed with it
+                        broken = True
+                        if future is not isolated:
+                            continue
+                        del pending[future]
+                        error = future.exception()
+                        ready.append((pos, [(path, type(error)(f"The worker died while parsing {path}")) for path in chunks[pos]]))
+                        continue
+                    del pending[future]
+                    if future.exception() != None:
+                        #Results that cant be sent back from the worker
+                        ready.append((pos, [(path, future.exception()) for path in chunks[pos]]))
+                    else:
+                        ready.append((pos, future.result()))
+                elif deadline != None and time.monotonic() >= deadline:
+                    del pending[future]
+                    timedOut = True
+                    ready.append((pos, [(path, TimeoutError(f"Parsing {path} took longer than {timeout} s")) for path in chunks[pos]]))
+
+            if timedOut or broken:
+                #The worker of a timed out chunk is stuck, a new pool has all workers free again
+                _stop(executor)
+                executor = executors[backend](max_workers=workers)
+                for future, (pos, deadline) in list(pending.items()):
+                    #Threads of the old pool go on and finish their chunks, killed or cancelled chunks are parsed again
+                    if future.done() and not _poolFailed(future) or backend == 'thread' and not future.done():
+                        continue
+                    del pending[future]
+                    if broken:
+                        suspects.append(pos)
+                    else:
+                        submit(pos)
+
+            for pos, results in ready:
+                del chunks[pos]
+                if ordered:
+                    finished[pos] = results
+                else:
+                    yield from results
+            while nextPos in finished:
+                yield from finished.pop(nextPos)
+                nextPos += 1
+    finally:
+        #Dont wait for workers stuck on timed out files or chunks that are not needed anymore
+        _stop(executor)
+
+def _poolFailed(future):
+    """Returns True if the chunk of a done future didnt finish because its pool was broken or shut down"""
+    return future.cancelled() or isinstance(future.exception(), BrokenExecutor)
+
+def _deadline(chunk, timeout):
+    return time.monotonic() + timeout * len(chunk) if timeout != None else None
+
+def _stop(executor):
+    """Shuts an executor down without waiting, worker processes are killed. Threads cant be stopped and finish in the background"""
+    processes = list((getattr(executor, '_processes', None) or {}).values())
+    for process in processes:
+        process.terminate()
+    #Without running processes the pool is closed right away
+    executor.shutdown(wait=bool(processes), cancel_futures=True)
+
+def _parseChunk(chunk, kwargs):
+    """Parses a chunk of paths in a worker and returns a list of (path, result) where result is the exception if parse raised one"""
+    results = []
+    for path in chunk:
+        try:
+            results.append((path, parse(path, **kwargs)))
+        except Exception as e:
+            results.append((path, e))
+    return results
+
+def validate(pathToXml, strict=False):
     """Validates a given file and returns a string if file is matching one of the supported formats.
-    Supported formats: IEC61131_10_Ed1_0.xsd, tc6_xml_v201.xsd, tc6_xml_v200.xsd, .json preparsed data, .apj - B&R automation studio project
+    Supported formats: IEC61131_10_Ed1_0.xsd, tc6_xml_v201.xsd, tc6_xml_v200.xsd, .json preparsed data, .jsonl preparsed data in JSON Lines, .plcx binary preparsed data, .apj - B&R automation studio project
+    Xml format is detected from the namespace of the root element by reading only the start of the file.
+    With strict=True the whole file is additionally validated against the schema of the detected format.
     If file doesnt match any, the function returns None"""
+    return _detect(pathToXml, strict)[0]
 
+def _detect(pathToXml, strict=False):
+    """Returns a tuple of the file type and the parsed xml document. The document is parsed only in strict mode,
+    where the same tree is used for schema validation and by the format parser. Otherwise the document is None"""
     if pathToXml.endswith('.json'):
-        return file_type.prepped
+        return file_type.prepped, None
+    elif pathToXml.endswith('.jsonl'):
+        return file_type.jsonl, None
+    elif pathToXml.endswith('.plcx'):
+        return file_type.binary, None
     elif pathToXml.endswith('.apj'):
-        return file_type.bnr
+        return file_type.bnr, None
     elif pathToXml.endswith('.xml'):
-        for xmlSchema in ('IEC61131_10_Ed1_0.xsd', 'tc6_xml_v201.xsd', 'tc6_xml_v200.xsd'):
-            schemaPath = pkg_resources.resource_filename(__name__, os.path.join('schema', xmlSchema))
-            xmlschema_doc = etree.parse(schemaPath)
-            xmlSchemaNode = etree.XMLSchema(xmlschema_doc)
-
-            xml_doc = etree.parse(pathToXml)
-
-            if xmlSchemaNode.validate(xml_doc):
-                if xmlSchema == 'tc6_xml_v201.xsd':
-                     return file_type.tc6v201
-                if xmlSchema == 'tc6_xml_v200.xsd':
-                     return file_type.tc6v200
-                if xmlSchema == 'IEC61131_10_Ed1_0.xsd':
-                     return file_type.iec61131_10
-    return None
\ No newline at end of file
+        xmlFormat = xmlFormats.get(_sniffXml(pathToXml))
+        if xmlFormat is None:
+            return None, None
+        fileType, xmlSchema = xmlFormat
+        if not strict:
+            return fileType, None
+
+        xml_doc = etree.parse(pathToXml, _xmlParser())
+        if getSchema(xmlSchema).validate(xml_doc):
+            return fileType, xml_doc
+    return None, None
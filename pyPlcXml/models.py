@@ -0,0 +1,202 @@
+from dataclasses import dataclass, fields
+
+#Typed model of parse results, an opt-in compact alternative to the dictionaries returned by parse.
+#Every model is a slotted dataclass so an object holds only its field values, without a per object dictionary of keys.
+#Models convert to and from the dictionary format without loss:
+#   keys - the dictionary keys of the converted item in their original order. Items of different formats have different keys,
+#       only these keys are written back by toDict. The tuples are shared between all items with the same keys
+#   extra - keys that dont have a field with their original value, None if there are none
+#Dictionary keys that are not valid field names map to other fields, 'if' is interface and 'class' is classes.
+
+#Shared key tuples, items of a project have only a few different layouts
+_keyTuples = {}
+
+class _Model:
+    """Conversion between a model and the dictionary format. Subclasses set
+        _FIELDS - dictionary key to field name for keys that are not named like their field
+        _NESTED - field name to the model of the items of a list field"""
+    __slots__ = ()
+    _FIELDS = {}
+    _NESTED = {}
+
+    @classmethod
+    def fromDict(cls, data):
+        """Returns a model of a dictionary in the format of parse"""
+        values = {}
+        extra = None
+        for key, value in data.items():
+            fieldName = cls._FIELDS.get(key, key)
+            if fieldName not in cls._fieldNames:
+                if extra == None:
+                    extra = {}
+                extra[key] = value
+                continue
+            if fieldName in cls._NESTED and isinstance(value, list):
+                value = [cls._nestedModel(fieldName, item).fromDict(item) if isinstance(item, dict) else item for item in value]
+            values[fieldName] = value
+        keys = tuple(data)
+        return cls(**values, extra=extra, keys=_keyTuples.setdefault(keys, keys))
+
+    @classmethod
+    def _nestedModel(cls, fieldName, item):
+        return cls._NESTED[fieldName]
+
+    def toDict(self):
+        """Returns the dictionary in the format of parse"""
+        keys = self.keys
+        if keys == None:
+            #Made by hand, all fields are written
+            keys = [key for key in self._defaultKeys if getattr(self, self._FIELDS.get(key, key)) != None]
+            if self.extra != None:
+                keys.extend(self.extra)
+        data = {}
+        for key in keys:
+            fieldName = self._FIELDS.get(key, key)
+            if fieldName not in self._fieldNames:
+                data[key] = self.extra[key]
+                continue
+            value = getattr(self, fieldName)
+            if fieldName in self._NESTED and isinstance(value, list):
+                value = [item.toDict() if isinstance(item, _Model) else item for item in value]
+            data[key] = value
+        return data
+
+    def set(self, key, value):
+        """Sets the value of a dictionary key, like data[key] = value on the dictionary format"""
+        fieldName = self._FIELDS.get(key, key)
+        if fieldName in self._fieldNames:
+            setattr(self, fieldName, value)
+        else:
+            if self.extra == None:
+                self.extra = {}
+            self.extra[key] = value
+        self._addKey(key)
+
+    def _addKey(self, key):
+        """Adds a key to the keys of a converted item so toDict writes it"""
+        if self.keys != None and key not in self.keys:
+            keys = self.keys + (key,)
+            self.keys = _keyTuples.setdefault(keys, keys)
+
+def _model(cls):
+    """Makes cls a slotted dataclass with the extra and keys fields and prepares its conversion tables"""
+    cls.__annotations__['extra'] = dict
+    cls.__annotations__['keys'] = tuple
+    cls.extra = None
+    cls.keys = None
+    cls = dataclass(slots=True)(cls)
+    cls._fieldNames = frozenset(f.name for f in fields(cls)) - {'extra', 'keys'}
+    fieldKeys = {fieldName : key for key, fieldName in cls._FIELDS.items()}
+    cls._defaultKeys = tuple(fieldKeys.get(f.name, f.name) for f in fields(cls) if f.name not in ('extra', 'keys'))
+    return cls
+
+@_model
+class Variable(_Model):
+    """Variable of a var block or component of a data type or global var list"""
+    name : str = None
+    type : str = None
+    attribute : str = None
+    initialValue : str = None
+    description : str = None
+    field1 : str = None
+    field2 : str = None
+
+@_model
+class VarBlock(_Model):
+    """VAR_INPUT, VAR_OUTPUT, VAR_IN_OUT or VAR block of an interface, or a global var list with its variables in vars"""
+    name : str = None
+    attribute : str = None
+    vars : list = None
+    _NESTED = {'vars' : Variable}
+
+@_model
+class DataType(_Model):
+    """Struct, enumeration or other data type with its components, or a resource global var list"""
+    name : str = None
+    baseType : str = None
+    initialValue : str = None
+    attribute : str = None
+    redund : str = None
+    description : str = None
+    field1 : str = None
+    field2 : str = None
+    components : list = None
+    _NESTED = {'components' : Variable}
+
+@_model
+class Pou(_Model):
+    """Program, function block, function, class, method or action"""
+    name : str = None
+    type : str = None
+    description : str = None
+    returnType : str = None
+    interface : list = None
+    code : str = None
+    actions : list = None
+    methods : list = None
+    docStrings : list = None
+    _FIELDS = {'if' : 'interface'}
+
+@_model
+class Namespace(_Model):
+    """Namespace with its POUs, data types and global var lists"""
+    name : str = None
+    prgs : list = None
+    fbs : list = None
+    fcs : list = None
+    classes : list = None
+    dts : list = None
+    vars : list = None
+    #IEC and B&R namespaces name their var lists var
+    _FIELDS = {'class' : 'classes', 'var' : 'vars'}
+    _NESTED = {'prgs' : Pou, 'fbs' : Pou, 'fcs' : Pou, 'classes' : Pou, 'dts' : DataType, 'vars' : VarBlock}
+
+    @classmethod
+    def _nestedModel(cls, fieldName, item):
+        if fieldName == 'vars':
+            #Global var lists keep their variables in vars, resource global var lists in components
+            return VarBlock if 'vars' in item else DataType
+        return cls._NESTED[fieldName]
+
+    def add(self, category, item):
+        """Adds an item in the dictionary format to a list like 'fbs', as iterTc6 and iterIec61131_10 yield them"""
+        fieldName = self._FIELDS.get(category, category)
+        if fieldName not in self._fieldNames:
+            if self.extra == None:
+                self.extra = {}
+            self.extra.setdefault(category, []).append(item)
+        else:
+            if getattr(self, fieldName) == None:
+                setattr(self, fieldName, [])
+            getattr(self, fieldName).append(self._nestedModel(fieldName, item).fromDict(item))
+        self._addKey(category)
+
+@_model
+class Project(_Model):
+    """Parsed project, info is the project information dictionary"""
+    info : dict = None
+    namespaces : list = None
+    _NESTED = {'namespaces' : Namespace}
+
+    @classmethod
+    def fromItems(cls, items):
+        """Returns a project built from (namespace name, category, item) tuples like iterTc6, iterIec61131_10 and iterLines yield.
+        Items are converted one at a time so the dictionaries of the whole project are never in memory"""
+        project = cls(namespaces=[], keys=('info', 'namespaces'))
+        namespaces = {}
+        for nsName, category, item in items:
+            if category == 'info':
+                project.info = item
+            elif category == 'namespace':
+                namespace = namespaces[nsName] = Namespace.fromDict(item)
+                project.namespaces.append(namespace)
+            else:
+                namespace = namespaces.get(nsName)
+                if namespace == None:
+                    namespace = namespaces[nsName] = Namespace(name=nsName, keys=('name',))
+                    project.namespaces.append(namespace)
+                namespace.add(category, item)
+        return project
+
+#Actions and methods of a POU are POUs themselves
+Pou._NESTED = {'interface' : VarBlock, 'actions' : Pou, 'methods' : Pou}
@@ -0,0 +1,119 @@
+import os, hashlib, pickle, tempfile, time
+from . import __version__
+from .brParser import _indexProject
+
+#Default size limit of a cache directory in bytes
+CACHE_SIZE = 256 * 1024 * 1024
+#Temporary files of writers that died are removed after this many seconds
+STALE_TMP_AGE = 3600
+#Writes of a process between two scans of a cache directory. Other processes write to the same directory,
+#so the size a process counts since its last scan is only an estimate and the directory is scanned again now and then
+EVICT_INTERVAL = 64
+
+#Entries are pickles, loading an entry can run any code that was put into the file. A cache directory must only be writable
+#by users that are trusted to run code in the processes that read it.
+
+#Cache directory to a list of the size at the last scan plus the size written by this process since then and the number of writes since then
+_written = {}
+
+def cacheKey(path, ignoredNs=(), strict=False):
+    """Returns the cache key of a file to parse. The key is a hash of the library version, the kind of file, the parse options
+    and the content. The file type follows from the content so the same content is always parsed to the same type.
+    For a B&R project the content is the .apj file and every file of the project index with its path"""
+    key = hashlib.sha256()
+    key.update(repr((__version__, os.path.splitext(path)[1].lower(), sorted(ignoredNs), bool(strict))).encode())
+    if path.endswith('.apj'):
+        projectDir = os.path.dirname(path)
+        index = _indexProject(os.path.join(projectDir, 'Logical'))
+        files = [path]
+        for directory in index['dirs']:
+            files.extend(os.path.join(directory, file) for file in index['files'][directory])
+        for fpath in files:
+            key.update(os.path.relpath(fpath, projectDir).encode() + b'\0')
+            key.update(_fileHash(fpath))
+    else:
+        key.update(_fileHash(path))
+    return key.hexdigest()
+
+def loadCached(cacheDir, key):
+    """Returns the cached parse result of key or None if there is none. A hit marks the entry as recently used.
+    The entry is unpickled, cacheDir must be a trusted directory"""
+    entryPath = os.path.join(cacheDir, f'{key}.pickle')
+    try:
+        with open(entryPath, 'rb') as f:
+            data = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    try:
+        os.utime(entryPath)
+    except OSError:
+        #Evicted by another process in the meantime
+        pass
+    return data
+
+def storeCached(cacheDir, key, data, maxSize=CACHE_SIZE):
+    """Stores the parse result of key and evicts the least recently used entries if the cache is bigger than maxSize bytes.
+    Every writer writes its own temporary file and moves it into place, so concurrent writers and readers never see a partial entry.
+    The directory is scanned for eviction only when the size this process counts exceeds maxSize or after EVICT_INTERVAL writes"""
+    os.makedirs(cacheDir, exist_ok=True)
+    fd, tmpPath = tempfile.mkstemp(dir=cacheDir, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(data, f, pickle.HIGHEST_PROTOCOL)
+            size = f.tell()
+        os.replace(tmpPath, os.path.join(cacheDir, f'{key}.pickle'))
+    except OSError:
+        #On windows another process can hold the entry open, it is writing the same data
+        try:
+            os.remove(tmpPath)
+        except OSError:
+            pass
+        return
+    written = _written.get(cacheDir)
+    if written != None:
+        written[0] += size
+        written[1] += 1
+    if written == None or written[0] > maxSize or written[1] >= EVICT_INTERVAL:
+        _written[cacheDir] = [_evict(cacheDir, maxSize, key), 0]
+
+def _evict(cacheDir, maxSize, keep):
+    """Removes the least recently used entries until the cache is not bigger than maxSize and returns the size of the cache.
+    The entry keep is never removed"""
+    entries = []
+    total = 0
+    now = time.time()
+    with os.scandir(cacheDir) as dirEntries:
+        for entry in dirEntries:
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            if entry.name.endswith('.pickle'):
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+            elif entry.name.endswith('.tmp') and now - stat.st_mtime > STALE_TMP_AGE:
+                _remove(entry.path)
+    entries.sort()
+    for mtime, size, entryPath in entries:
+        if total <= maxSize:
+            break
+        if os.path.basename(entryPath) == f'{keep}.pickle':
+            continue
+        _remove(entryPath)
+        total -= size
+    return total
+
+def _remove(path):
+    """Removes a file that another process could have removed already"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _fileHash(path, chunkSize=1 << 20):
+    """Returns the sha256 digest of the content of a file"""
+    fileHash = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunkSize), b''):
+            fileHash.update(chunk)
+    return fileHash.digest()
@@ -0,0 +1,36 @@
+import pkg_resources, os, threading
+from lxml import etree
+
+#All schemas shipped in the schema folder
+SCHEMAS = (
+    'IEC61131_10_Ed1_0.xsd',
+    'tc6_xml_v201.xsd',
+    'tc6_xml_v200.xsd',
+    'tc6_xml_v100B.xsd',
+    'tc6_xml_v100.xsd'
+)
+
+#Compiled schemas shared by every caller in the process
+_compiled = {}
+_lock = threading.Lock()
+
+def getSchema(xmlSchema):
+    """Returns the compiled lxml XMLSchema of one of the SCHEMAS.
+    The schema is compiled on its first request and the same object is returned to every caller after that"""
+    schema = _compiled.get(xmlSchema)
+    if schema is None:
+        with _lock:
+            #Another thread could have compiled it while this one waited for the lock
+            schema = _compiled.get(xmlSchema)
+            if schema is None:
+                if xmlSchema not in SCHEMAS:
+                    raise ValueError(f"Unknown schema {xmlSchema}, expected one of {SCHEMAS}")
+                schemaPath = pkg_resources.resource_filename(__name__, os.path.join('schema', xmlSchema))
+                schema = etree.XMLSchema(etree.parse(schemaPath))
+                _compiled[xmlSchema] = schema
+    return schema
+
+def warmupSchemas(schemas=SCHEMAS):
+    """Compiles the given schemas ahead of time so long running services dont pay for it on the first validation"""
+    for xmlSchema in schemas:
+        getSchema(xmlSchema)
@@ -0,0 +1,182 @@
+import re
+
+#Single pass parser of IEC structured text declarations: VAR blocks of .var and .fun files and TYPE blocks of .typ files.
+#The scanner matches one whole declaration at a time, comments, strings and brackets are matched as a unit
+#so a ; or := inside of them doesnt end the declaration. The parser keeps a stack of open STRUCTs.
+#Patterns run on python 3.10 so they dont use possessive quantifiers. Repetitions are unrolled as run (separator run)*, where
+#the runs cant contain the first character of a separator, so text can be split in only one way and a failed match cant
+#backtrack into other splits of the same text.
+
+_COMMENT = r'\(\*[^*]*(?:\*(?!\))[^*]*)*\*\)'
+_STRING = r"'[^'$]*(?:\$.[^'$]*)*'|\"[^\"$]*(?:\$.[^\"$]*)*\""
+#Type or initial value, ends at ; or := that are not inside of a comment, string or bracket
+_VALUE_RUN = r"[^;:'\"(\[]*"
+_VALUE = (r"(?!;|:=)" + _VALUE_RUN + r"(?:(?::(?!=)|\[[^\]]*\]|" + _COMMENT + r"|\((?!\*)[^)]*\)|" + _STRING + r")"
+          + _VALUE_RUN + r")*")
+_ENUM_RUN = r"[^()'\"]*"
+#Up to three comments after a declaration are its description, field1 and field2
+_DESCRIPTION = r'\s*(?:\(\*(?P<Desc1>{0})\*\)\s*(?:\(\*(?P<Desc2>{0})\*\)\s*(?:\(\*(?P<Desc3>{0})\*\)\s*)?)?)?'.format(r'[^*]*(?:\*(?!\))[^*]*)*')
+
+#A declaration with a name and neither a type nor enumeration data is a STRUCT, EnumData includes its brackets
+#so an empty enumeration can be told from no enumeration
+RX_DECLARATION = re.compile(
+    r'\s*(?:'
+    #Block keywords with their attribute
+    r'(?P<Keyword>END_STRUCT|END_TYPE|END_VAR|VAR_INPUT|VAR_OUTPUT|VAR_IN_OUT|VAR|TYPE)\b(?:[ \t]+(?P<Attribute>RETAIN|CONSTANT)\b)?\s*;?'
+    #Name : {Redund} followed by a STRUCT, an enumeration or a type with an optional initial value
+    r'|(?P<Name>\w+(?!\w)(?:[ \t]*,[ \t]*\w+(?!\w))*)\s*:(?!=)\s*(?P<Redund>{[^}]*})?\s*'
+    r'(?:STRUCT\b'
+    r'|(?P<EnumData>\(' + _ENUM_RUN + r'(?:(?:' + _COMMENT + r'|' + _STRING + r')' + _ENUM_RUN + r')*\))\s*(?::=\s*(?P<EnumInitial>[^;]*?)\s*)?;'
+    r'|(?P<Type>' + _VALUE + r')(?::=(?P<Initial>' + _VALUE + r'))?;'
+    r')' + _DESCRIPTION +
+    #Anything else is skipped
+    r'|' + _COMMENT + r'|\S[^\s(]*'
+    r')', re.S)
+
+#Enumeration values and the comments around them. Comment is matched with its markers so findall can tell an empty comment
+#from no comment
+RX_ENUM_MEMBER = re.compile(
+    r'\s*(?:(?P<Comment>' + _COMMENT + r')'
+    #Initial includes the whitespace before the , and is stripped
+    r'|(?P<Name>[^\s,:=(]+)(?:\s*:=\s*(?P<Initial>[^,(]*(?:\((?!\*)[^,(]*)*))?\s*(?:,|(?=\(\*)|$)'
+    r'|\S)', re.S)
+
+#Comments of an enumeration or enumeration value are its description, field1 and field2
+_DESCRIPTION_KEYS = ('description', 'field1', 'field2')
+
+#Interface blocks are returned grouped in this order
+BLOCK_ORDER = ('VAR_INPUT', 'VAR_OUTPUT', 'VAR_IN_OUT', 'VAR')
+
+def parseInterface(text):
+    """Parses the VAR blocks in text and returns a list of dictionaries representing var blocks:
+    {
+        'name' : VAR_BLOCK,
+        'attribute' : retain,
+        'vars' : []
+    }
+    Blocks are grouped by kind in the order of BLOCK_ORDER"""
+    blocks = {blockName : [] for blockName in BLOCK_ORDER}
+    block = None
+    #findall returns empty strings for the groups that didnt take part in the match
+    for keyword, attribute, name, redund, enumData, enumInitial, typ, initial, desc1, desc2, desc3 in RX_DECLARATION.findall(text):
+        if typ:
+            if block != None:
+                block['vars'].append({
+                    'name' : name,
+                    'type' : typ.strip(),
+                    'initialValue' : initial.strip(),
+                    'description' : desc1,
+                    'attribute' : block['attribute']
+                })
+        elif keyword in blocks:
+            block = {
+                'name' : keyword,
+                'attribute' : attribute,
+                'vars' : []
+            }
+            blocks[keyword].append(block)
+        elif keyword:
+            block = None
+    return [block for blockName in BLOCK_ORDER for block in blocks[blockName]]
+
+def parseTypes(text):
+    """Parses the TYPE blocks in text and returns a list of data types(structs and enumerations) in dictionary format.
+    Structs of a TYPE block come before its enumerations. A STRUCT declared inside of a struct is a component
+    of type STRUCT with its own components"""
+    dts = []
+    structs = []
+    enums = []
+    #Structs that are not closed yet, the innermost is last
+    stack = []
+    for keyword, attribute, name, redund, enumData, enumInitial, typ, initial, desc1, desc2, desc3 in RX_DECLARATION.findall(text):
+        if typ:
+            if stack:
+                stack[-1]['components'].append({
+                    'name' : name,
+                    'type' : typ.strip(),
+                    'attribute' : redund or None,
+                    'initialValue' : initial.strip(),
+                    'description' : desc1,
+                    'field1' : desc2,
+                    'field2' : desc3
+                })
+
+        elif enumData:
+            if not stack:
+                enums.append(_parseEnum(name, enumData[1:-1], enumInitial))
+
+        elif name:
+            if stack:
+                dt = {
+                    'name' : name,
+                    'type' : 'STRUCT',
+                    'attribute' : redund or None,
+                    'initialValue' : '',
+                    'description' : desc1,
+                    'field1' : desc2,
+                    'field2' : desc3,
+                    'components' : []
+                }
+                stack[-1]['components'].append(dt)
+            else:
+                dt = {
+                    'baseType' : 'struct',
+                    'name' : name,
+                    'redund' : redund or None,
+                    'description' : desc1,
+                    'field1' : desc2,
+                    'field2' : desc3,
+                    'components' : []
+                }
+                structs.append(dt)
+            stack.append(dt)
+
+        elif keyword == 'END_STRUCT':
+            if stack:
+                stack.pop()
+        elif keyword == 'END_TYPE':
+            dts.extend(structs)
+            dts.extend(enums)
+            structs, enums, stack = [], [], []
+
+    #A missing END_TYPE at the end of the file
+    dts.extend(structs)
+    dts.extend(enums)
+    return dts
+
+def _parseEnum(name, enumData, initialValue):
+    """Returns an enumeration in dictionary format.
+    Comments before the first value describe the enumeration, comments after a value describe that value"""
+    dt = {
+        'name' : name,
+        'baseType' : 'enumeration',
+        'components' : [],
+        'description' : '',
+        'field1' : '',
+        'field2' : ''
+    }
+    #Comments are collected for the last enumeration value or the enumeration itself
+    described = dt
+    descriptions = []
+    components = dt['components']
+    for comment, name, initial in RX_ENUM_MEMBER.findall(enumData):
+        if comment:
+            descriptions.append(comment[2:-2])
+        elif name:
+            if descriptions:
+                described.update(zip(_DESCRIPTION_KEYS, descriptions))
+                descriptions = []
+            described = {
+                'name' : name,
+                'type' : '',
+                'attribute' : '',
+                'initialValue' : initial.strip(),
+                'description' : '',
+                'field1' : '',
+                'field2' : ''
+            }
+            components.append(described)
+    if descriptions:
+        described.update(zip(_DESCRIPTION_KEYS, descriptions))
+    dt['initialValue'] = initialValue
+    return dt
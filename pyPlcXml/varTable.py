@@ -0,0 +1,258 @@
+from collections import Counter
+from itertools import compress
+
+#Columnar table of every variable of a project for project wide queries.
+#Every column is dictionary encoded: the distinct strings of the column are stored once and every row is one character of a string
+#whose code point is the position of its value. Python stores such a string with 1, 2 or 4 bytes per row depending on the number
+#of distinct values, and the scans of filters and group by run in C on that string instead of walking the nested dictionaries.
+#Filters return a Selection, a bitmask of rows held in a python int, so conditions are combined with & | ~ in C as well.
+
+COLUMNS = ('namespace', 'pou', 'block', 'name', 'type', 'attribute', 'initialValue', 'description')
+
+#Namespace lists with POUs, their interfaces are in 'if'
+POU_CATEGORIES = ('prgs', 'fbs', 'fcs', 'class')
+#Namespace lists with global var lists, var lists keep their variables in 'vars' or 'components'
+VAR_CATEGORIES = ('vars', 'var')
+#Block of the variables of global var lists
+GLOBAL_BLOCK = 'VAR_GLOBAL'
+
+#Columns with up to this many values are grouped by counting every value instead of every row
+_SPLIT_LIMIT = 64
+
+#Bits of a mask in binary notation to selector bytes of itertools.compress
+_SELECTORS = bytes.maketrans(b'01', b'\x00\x01')
+
+class Selection:
+    """Set of rows of a VarTable as a bitmask, bit i is row i. Selections of the same table are combined with & | ~"""
+    __slots__ = ('mask', 'size')
+
+    def __init__(self, mask, size):
+        self.mask = mask
+        self.size = size
+
+    def __and__(self, other):
+        return Selection(self.mask & other.mask, self.size)
+
+    def __or__(self, other):
+        return Selection(self.mask | other.mask, self.size)
+
+    def __invert__(self):
+        return Selection(self.mask ^ ((1 << self.size) - 1), self.size)
+
+    def __len__(self):
+        return self.mask.bit_count()
+
+    def __bool__(self):
+        return self.mask != 0
+
+    def __iter__(self):
+        """Yields the selected row numbers in ascending order"""
+        return compress(range(self.size), self.selectors())
+
+    def selectors(self):
+        """Returns bytes with 1 for every selected row and 0 for the others, the selectors of itertools.compress"""
+        if not self.size:
+            return b''
+        return format(self.mask, f'0{self.size}b')[::-1].encode().translate(_SELECTORS)
+
+class _Column:
+    """Dictionary encoded column, values are the distinct strings and codes holds the position of the value of every row"""
+    __slots__ = ('values', 'codes', '_index', '_bytes')
+
+    def __init__(self, values, codes):
+        self.values = values
+        self.codes = codes
+        self._index = {value : code for code, value in enumerate(values)}
+        #Columns with up to 256 values are also kept as bytes for bytes.translate
+        self._bytes = codes.encode('latin-1') if len(values) <= 256 else None
+
+    def mask(self, codes):
+        """Returns the bitmask of the rows with one of the codes"""
+        size = len(self.codes)
+        if not codes or not size:
+            return 0
+        #Fewer codes are faster to scan for, the rows of the other codes are inverted
+        invert = len(codes) > len(self.values) // 2
+        if invert:
+            codes = set(range(len(self.values))) - set(codes)
+        if self._bytes != None:
+            table = bytearray(b'0' * 256)
+            for code in codes:
+                table[code] = ord('1')
+            bits = self._bytes.translate(table)
+        else:
+            bits = bytearray(b'0' * size)
+            for code in codes:
+                char = chr(code)
+                row = self.codes.find(char)
+                while row != -1:
+                    bits[row] = ord('1')
+                    row = self.codes.find(char, row + 1)
+        mask = int(bits[::-1], 2) if bits else 0
+        return mask ^ ((1 << size) - 1) if invert else mask
+
+class VarTable:
+    """Every variable of a project in dictionary encoded columns, see COLUMNS. Variables of POU interfaces, methods and global var lists
+    are included, variables of methods have the POU name 'POU.Method' and variables of global var lists the block VAR_GLOBAL
+
+        table = VarTable.fromProject(pyPlcXml.parse(path))
+        realRetains = table.where(attribute='RETAIN', type='REAL')
+        table.groupBy('namespace', where=table.where(initialValue=lambda value: value != ''))
+    """
+
+    def __init__(self, rows=()):
+        """rows - iterable of tuples of strings in the order of COLUMNS"""
+        values = [{} for column in COLUMNS]
+        codes = [[] for column in COLUMNS]
+        for row in rows:
+            for columnValues, columnCodes, value in zip(values, codes, row):
+                value = '' if value == None else str(value)
+                code = columnValues.get(value)
+                if code == None:
+                    code = columnValues[value] = len(columnValues)
+                columnCodes.append(chr(code))
+        self._columns = {}
+        for column, columnValues, columnCodes in zip(COLUMNS, values, codes):
+            self._columns[column] = _Column(list(columnValues), ''.join(columnCodes))
+        self.size = len(codes[0])
+
+    @classmethod
+    def fromProject(cls, data):
+        """Returns the table of a parse result, a dictionary or a pyPlcXml.Project"""
+        if not isinstance(data, dict):
+            data = data.toDict()
+        return cls.fromItems((namespace.get('name'), category, item)
+            for namespace in data.get('namespaces', [])
+            for category in POU_CATEGORIES + VAR_CATEGORIES
+            for item in namespace.get(category) or [])
+
+    @classmethod
+    def fromItems(cls, items):
+        """Returns the table of (namespace name, category, item) tuples like iterTc6, iterIec61131_10 and iterLines yield.
+        Only the columns are kept, so a project of any size can be streamed into a table"""
+        return cls(row for nsName, category, item in items for row in _itemRows(nsName, category, item))
+
+    def __len__(self):
+        return self.size
+
+    def all(self):
+        """Returns a Selection of all rows"""
+        return Selection((1 << self.size) - 1, self.size)
+
+    def where(self, **conditions):
+        """Returns a Selection of the rows that match all conditions, column=condition where condition is
+            a string - value is equal to the string
+            a list, tuple or set of strings - value is one of them
+            a callable - called once per distinct value of the column, rows where it returns True are selected
+        Comparisons are case sensitive"""
+        mask = (1 << self.size) - 1
+        for column, condition in conditions.items():
+            mask &= self._mask(column, condition)
+        return Selection(mask, self.size)
+
+    def column(self, column, where=None):
+        """Returns a list of the values of a column of the selected rows, all rows if where is None"""
+        col = self._getColumn(column)
+        if where == None:
+            return [col.values[ord(code)] for code in col.codes]
+        return [col.values[ord(code)] for code in compress(col.codes, where.selectors())]
+
+    def rows(self, where=None):
+        """Yields the selected rows as dictionaries with the keys of COLUMNS"""
+        columns = [self._columns[column] for column in COLUMNS]
+        for row in (range(self.size) if where == None else where):
+            yield {column : col.values[ord(col.codes[row])] for column, col in zip(COLUMNS, columns)}
+
+    def groupBy(self, *columns, where=None):
+        """Returns a dictionary of the number of selected rows per value of a column, or per tuple of values of several columns,
+        ordered from the most to the least common"""
+        if not columns:
+            raise ValueError('groupBy needs at least one column')
+        cols = [self._getColumn(column) for column in columns]
+        counts = Counter()
+        self._group(cols, where, (), counts)
+        if len(cols) == 1:
+            return {key[0] : count for key, count in counts.most_common()}
+        return dict(counts.most_common())
+
+    def _group(self, cols, where, prefix, counts):
+        """Adds the counts of the selected rows per tuple of values of cols to counts, keys start with prefix.
+        Columns with few values are counted with str.count and split into one selection per value,
+        the others are counted per row"""
+        col = cols[0]
+        codes = col.codes if where == None else ''.join(compress(col.codes, where.selectors()))
+        if len(col.values) > _SPLIT_LIMIT:
+            selected = [codes] + [c.codes if where == None else compress(c.codes, where.selectors()) for c in cols[1:]]
+            for key, count in Counter(zip(*selected)).items():
+                counts[prefix + tuple(c.values[ord(code)] for c, code in zip(cols, key))] += count
+            return
+        for code, value in enumerate(col.values):
+            count = codes.count(chr(code))
+            if not count:
+                continue
+            if len(cols) == 1:
+                counts[prefix + (value,)] += count
+            else:
+                split = Selection(col.mask([code]), self.size)
+                self._group(cols[1:], split if where == None else split & where, prefix + (value,), counts)
+
+    def toPandas(self, where=None):
+        """Returns a pandas DataFrame of the selected rows with categorical columns, needs pandas"""
+        try:
+            import pandas
+        except ImportError:
+            raise ImportError('VarTable.toPandas needs pandas, install it with pip install pandas') from None
+        data = {}
+        for column in COLUMNS:
+            codes = self._codes(column, where)
+            data[column] = pandas.Categorical.from_codes(codes, self._columns[column].values)
+        return pandas.DataFrame(data)
+
+    def toArrow(self, where=None):
+        """Returns a pyarrow Table of the selected rows with dictionary encoded columns, needs pyarrow"""
+        try:
+            import pyarrow
+        except ImportError:
+            raise ImportError('VarTable.toArrow needs pyarrow, install it with pip install pyarrow') from None
+        arrays = []
+        for column in COLUMNS:
+            codes = self._codes(column, where)
+            arrays.append(pyarrow.DictionaryArray.from_arrays(pyarrow.array(codes, pyarrow.int32()), pyarrow.array(self._columns[column].values, pyarrow.string())))
+        return pyarrow.Table.from_arrays(arrays, names=list(COLUMNS))
+
+    def _codes(self, column, where):
+        """Returns a list of the value positions of a column of the selected rows"""
+        codes = self._columns[column].codes
+        return list(map(ord, codes if where == None else compress(codes, where.selectors())))
+
+    def _getColumn(self, column):
+        col = self._columns.get(column)
+        if col == None:
+            raise KeyError(f'Unknown column {column}, expected one of {COLUMNS}')
+        return col
+
+    def _mask(self, column, condition):
+        col = self._getColumn(column)
+        if callable(condition):
+            codes = [code for code, value in enumerate(col.values) if condition(value)]
+        elif isinstance(condition, str):
+            code = col._index.get(condition)
+            codes = [code] if code != None else []
+        else:
+            codes = [col._index[value] for value in condition if value in col._index]
+        return col.mask(codes)
+
+def _itemRows(nsName, category, item):
+    """Yields the rows of the variables of one namespace list item"""
+    if category in POU_CATEGORIES:
+        yield from _interfaceRows(nsName, item.get('name'), item.get('if'))
+        for method in item.get('methods') or []:
+            yield from _interfaceRows(nsName, f"{item.get('name')}.{method.get('name')}", method.get('if'))
+    elif category in VAR_CATEGORIES:
+        for var in item.get('vars', item.get('components')) or []:
+            yield nsName, item.get('name'), GLOBAL_BLOCK, var.get('name'), var.get('type'), var.get('attribute'), var.get('initialValue'), var.get('description')
+
+def _interfaceRows(nsName, pouName, interface):
+    for block in interface or []:
+        for var in block.get('vars') or []:
+            yield nsName, pouName, block.get('name'), var.get('name'), var.get('type'), var.get('attribute'), var.get('initialValue'), var.get('description')
@@ -1,9 +1,11 @@
-import xml.etree.ElementTree as ET
-from .helpers import ns, file_type
+from lxml import etree
+from .helpers import file_type, xmlFormats, _nsMap, _getRoot, _sniffXml
 
 #----------------- TC6 v200 and v201 PARSER-----------------------------
-def tc6Parse(pathToXml, tc6_version=file_type.tc6v201, ignoredNs=[]):
-    """Returns a data dictionary of format:
+def tc6Parse(pathToXml, tc6_version=file_type.tc6v201, ignoredNs=[], stripAddData=False):
+    """pathToXml can be a path or an already parsed lxml tree, so a document is never parsed twice.
+    stripAddData drops vendor addData that isnt read while a file is parsed, the result is the same with less memory.
+    Returns a data dictionary of format:
     {
         #Project information
         info : {
@@ -39,60 +41,37 @@ def tc6Parse(pathToXml, tc6_version=file_type.tc6v201, ignoredNs=[]):
     }"""
     data = {}
 
-    #Change namespaces to tc6_0200 or tc6_0201
+    #Each parse uses its own namespace map with tc6_0200 or tc6_0201 so parses can run in parallel threads
     if tc6_version == file_type.tc6v201:
-        ns['ns'] = r"http://www.plcopen.org/xml/tc6_0201"
+        ns = _nsMap(r"http://www.plcopen.org/xml/tc6_0201")
     elif tc6_version == file_type.tc6v200:
-        ns['ns'] = r"http://www.plcopen.org/xml/tc6_0200"
+        ns = _nsMap(r"http://www.plcopen.org/xml/tc6_0200")
     else:
         return None
 
     #Get project information
-    tree = ET.parse(pathToXml)
-    root = tree.getroot()
-    fileHeader = root.find('ns:fileHeader', ns)
-    contentHeader = root.find('ns:contentHeader', ns)
-    data['info'] = {
-        'companyName' : contentHeader.get('organization'),
-		'companyURL' : fileHeader.get('companyURL'),
-		'projectName' : contentHeader.get('name'),
-		'projectVersion' : contentHeader.get('version'),
-		'projectURL' : '',
-        'contentDescription' : fileHeader.get('contentDescription'),
-        'contactPerson' : contentHeader.get('author'),
-		'contentGenerated' : contentHeader.get('modificationDateTime'),
-    }
-    #Find the project description if attribute missing
-    if data['info']['contentDescription'] == None:
-        desc = contentHeader.find('ns:Comment', ns)
-        if desc != None:
-            data['info']['contentDescription'] = desc.text
-        else:
-            data['info']['contentDescription'] = ''
-    
-    #Remove new lines from the description to prevent breaking the markdown
-    for invalidChar in ('\n', '  '):
-        data['info']['contentDescription'] = data['info']['contentDescription'].replace(invalidChar, ' ')
+    root = _getRoot(pathToXml, stripAddData)
+    data['info'] = _parseTc6Info(root.find('ns:fileHeader', ns), root.find('ns:contentHeader', ns), ns)
 
     #Start looking for namespaces and interesting stuff
     data['namespaces'] = []
 
     #Find global POUs and Data types
     if 'Global' not in ignoredNs:
-        globalns = parseGlobalNamespace(root)
+        globalns = parseGlobalNamespace(root, ns)
         if globalns:
             data['namespaces'].append(globalns)
 
     #Find other namespaces (dont exist in TC6 but its in add data)
     #Support for CODESYS elements in the instance node
-    codesys_ns = parseCodesysAddData(root)
+    codesys_ns = parseCodesysAddData(root, ns)
     if codesys_ns:
         for nspace in codesys_ns:
             if nspace.get('name') not in ignoredNs:
                 data['namespaces'].append(nspace)
         return data
     #Support for TwinCat resources in addData
-    twincat_ns = parseTwincatAddData(root)
+    twincat_ns = parseTwincatAddData(root, ns)
     if twincat_ns:
         for nspace in twincat_ns:
             if nspace.get('name') not in ignoredNs:
@@ -101,7 +80,141 @@ def tc6Parse(pathToXml, tc6_version=file_type.tc6v201, ignoredNs=[]):
     
     return data
 
-def parseGlobalNamespace(root):
+def iterTc6(pathToXml, tc6_version=None, ignoredNs=()):
+    """Generator version of tc6Parse built on iterparse. Every POU, data type and global var list is parsed and yielded
+    as soon as its closing tag is seen and then freed, so memory is bounded by the largest element instead of the document.
+    Version is detected from the root element if tc6_version is None.
+    Yields tuples of (namespace name, category, item):
+        (None, 'info', info) - project information, comes first
+        (namespace name, 'prgs' | 'fbs' | 'fcs' | 'class' | 'dts' | 'vars', item) - item has the same format as in tc6Parse"""
+    if tc6_version is None:
+        tc6_version = xmlFormats.get(_sniffXml(pathToXml), (None, None))[0]
+
+    #Each parse uses its own namespace map with tc6_0200 or tc6_0201 so parses can run in parallel threads
+    if tc6_version == file_type.tc6v201:
+        ns = _nsMap(r"http://www.plcopen.org/xml/tc6_0201")
+    elif tc6_version == file_type.tc6v200:
+        ns = _nsMap(r"http://www.plcopen.org/xml/tc6_0200")
+    else:
+        return
+
+    pouCategories = {'program' : 'prgs', 'functionBlock' : 'fbs', 'function' : 'fcs', 'class' : 'class'}
+    tags = [f"{{{ns['ns']}}}{tag}" for tag in ('contentHeader', 'globalVars', 'dataType', 'pou', 'data')]
+    codesysFound = False
+    for _, elem in etree.iterparse(pathToXml, events=('end',), tag=tags, remove_comments=True, remove_pis=True, huge_tree=True, resolve_entities=False):
+        tag = etree.QName(elem).localname
+        if tag == 'contentHeader':
+            yield None, 'info', _parseTc6Info(elem.getparent().find('ns:fileHeader', ns), elem, ns)
+            continue
+
+        if tag == 'data':
+            #Vendor data directly in a resource or the project is complete at this point, everything needed was already yielded
+            if _localName(elem.getparent().getparent()) in ('resource', 'project'):
+                _freeElement(elem)
+            continue
+
+        #Only elements that tc6Parse would read are parsed, others are part of an unfinished POU or unsupported
+        vendor, nsName = _tc6StreamContext(elem, tag)
+        if vendor == None:
+            continue
+
+        #Twincat resources are only used when there are no CODESYS namespaces, a CODESYS namespace counts even if it is ignored
+        #like in tc6Parse
+        if vendor == 'Codesys' and (tag != 'pou' or elem.get('pouType') in pouCategories):
+            codesysFound = True
+        if nsName in ignoredNs or (vendor == 'Twincat' and codesysFound):
+            _freeElement(elem)
+            continue
+
+        if tag == 'pou':
+            pou = _parseTc6POU(elem, ns)
+            category = pouCategories.get(pou.get('type'))
+            item = pou
+        elif tag == 'dataType':
+            category = 'dts'
+            item = _parseTc6VarList(elem, ns)
+        else:
+            category = 'vars'
+            if vendor == 'Global':
+                item = {
+                    'name' : elem.get('name'),
+                    'vars' : [_parseTc6Var(var, 'Global', ns) for var in elem.findall('ns:variable', ns)]
+                }
+            else:
+                item = {
+                    'name' : elem.get('name'),
+                    'components' : [_parseTc6Var(var, 'Resource Global', ns) for var in elem.findall('ns:variable', ns)]
+                }
+        _freeElement(elem)
+
+        if category != None:
+            yield nsName, category, item
+
+def _tc6StreamContext(elem, tag):
+    """Returns a tuple (vendor, namespace name) telling where a pou, dataType or globalVars element is located.
+    vendor is 'Global', 'Codesys' or 'Twincat'. Returns (None, None) for elements tc6Parse doesnt read"""
+    parent = elem.getparent()
+    if tag == 'globalVars':
+        if _localName(parent) == 'types':
+            return 'Global', 'Global'
+        resource = parent
+    else:
+        if _localName(parent) in ('pous', 'dataTypes') and _localName(parent.getparent()) == 'types':
+            return 'Global', 'Global'
+        #Resource elements are in resource/addData/data
+        if _localName(parent) != 'data' or _localName(parent.getparent()) != 'addData':
+            return None, None
+        resource = parent.getparent().getparent()
+
+    if _localName(resource) != 'resource':
+        return None, None
+    #CODESYS resources are in instances/configurations/configuration and take the name of the configuration
+    owner = resource.getparent()
+    if _localName(owner) == 'configuration':
+        return 'Codesys', owner.get('name')
+    #TwinCat resources are in the project addData
+    if _localName(owner) == 'data':
+        return 'Twincat', resource.get('name')
+    return None, None
+
+def _localName(node):
+    """Returns the tag name of the node without the namespace or None if there is no node"""
+    if node is None:
+        return None
+    return etree.QName(node).localname
+
+def _freeElement(elem):
+    """Clears a processed element and removes the already processed siblings before it from its parent"""
+    elem.clear()
+    while elem.getprevious() is not None:
+        del elem.getparent()[0]
+
+def _parseTc6Info(fileHeader, contentHeader, ns):
+    """Returns the project information dictionary from the fileHeader and contentHeader nodes"""
+    info = {
+        'companyName' : contentHeader.get('organization'),
+		'companyURL' : fileHeader.get('companyURL'),
+		'projectName' : contentHeader.get('name'),
+		'projectVersion' : contentHeader.get('version'),
+		'projectURL' : '',
+        'contentDescription' : fileHeader.get('contentDescription'),
+        'contactPerson' : contentHeader.get('author'),
+		'contentGenerated' : contentHeader.get('modificationDateTime'),
+    }
+    #Find the project description if attribute missing
+    if info['contentDescription'] == None:
+        desc = contentHeader.find('ns:Comment', ns)
+        if desc != None:
+            info['contentDescription'] = desc.text
+        else:
+            info['contentDescription'] = ''
+    
+    #Remove new lines from the description to prevent breaking the markdown
+    for invalidChar in ('\n', '  '):
+        info['contentDescription'] = info['contentDescription'].replace(invalidChar, ' ')
+    return info
+
+def parseGlobalNamespace(root, ns):
 
     devNs = {
         'name' : 'Global'
@@ -121,15 +234,15 @@ def parseGlobalNamespace(root):
             'name' : varNode.get('name'),
             'vars' : []
         }
-        varList['vars'] = [_parseTc6Var(var, 'Global') for var in varNode.findall('ns:variable', ns)]
+        varList['vars'] = [_parseTc6Var(var, 'Global', ns) for var in varNode.findall('ns:variable', ns)]
         devNs['vars'].append(varList)
     
     datatypesNode = root.find('ns:types/ns:dataTypes', ns)
-    if datatypesNode:
-        devNs['dts'] = [_parseTc6VarList(dt) for dt in datatypesNode.findall('ns:dataType', ns)]
+    if datatypesNode is not None and len(datatypesNode):
+        devNs['dts'] = [_parseTc6VarList(dt, ns) for dt in datatypesNode.findall('ns:dataType', ns)]
 
     for pou in root.find('ns:types/ns:pous', ns).findall('ns:pou', ns):
-        temp = _parseTc6POU(pou)
+        temp = _parseTc6POU(pou, ns)
         if temp.get('type') == 'program':
             devNs['prgs'].append(temp)
         elif temp.get('type') == 'functionBlock':
@@ -144,7 +257,7 @@ def parseGlobalNamespace(root):
         return devNs
     return None
 
-def parseCodesysAddData(root):
+def parseCodesysAddData(root, ns):
     nsList = []
     for config in root.findall('./ns:instances/ns:configurations/ns:configuration', ns):
         for resource in config.findall('./ns:resource', ns):
@@ -164,14 +277,14 @@ def parseCodesysAddData(root):
                     'name' : varNode.get('name'),
                     'components' : []
                 }
-                varList['components'] = [_parseTc6Var(var, 'Resource Global') for var in varNode.findall('ns:variable', ns)]
+                varList['components'] = [_parseTc6Var(var, 'Resource Global', ns) for var in varNode.findall('ns:variable', ns)]
                 devNs['vars'].append(varList)
 
             for dt in resource.findall('./ns:addData/ns:data/ns:dataType', ns):
-                devNs['dts'].append(_parseTc6VarList(dt))
+                devNs['dts'].append(_parseTc6VarList(dt, ns))
 
             for pou in resource.findall('./ns:addData/ns:data/ns:pou', ns):
-                temp = _parseTc6POU(pou)
+                temp = _parseTc6POU(pou, ns)
                 if temp.get('type') == 'program':
                     devNs['prgs'].append(temp)
                 elif temp.get('type') == 'functionBlock':
@@ -189,7 +302,7 @@ def parseCodesysAddData(root):
         return nsList
     return None
 
-def parseTwincatAddData(root):
+def parseTwincatAddData(root, ns):
     nsList = []
     for resource in root.findall('./ns:addData/ns:data/ns:resource', ns):
         devNs = {
@@ -208,14 +321,14 @@ def parseTwincatAddData(root):
                 'name' : varNode.get('name'),
                 'components' : []
             }
-            varList['components'] = [_parseTc6Var(var, 'Resource Global') for var in varNode.findall('ns:variable', ns)]
+            varList['components'] = [_parseTc6Var(var, 'Resource Global', ns) for var in varNode.findall('ns:variable', ns)]
             devNs['vars'].append(varList)
     
         for dt in resource.findall('./ns:addData/ns:data/ns:dataType', ns):
-                devNs['dts'].append(_parseTc6VarList(dt))
+                devNs['dts'].append(_parseTc6VarList(dt, ns))
 
         for pou in resource.findall('./ns:addData/ns:data/ns:pou', ns):
-            temp = _parseTc6POU(pou)
+            temp = _parseTc6POU(pou, ns)
             if temp.get('type') == 'program':
                 devNs['prgs'].append(temp)
             elif temp.get('type') == 'functionBlock':
@@ -233,7 +346,7 @@ def parseTwincatAddData(root):
         return nsList
     return None
 
-def _parseTc6POU(pouNode):
+def _parseTc6POU(pouNode, ns):
     """Returns a dictionary of format:
     {
         'name' : 'POU name',
@@ -273,13 +386,13 @@ def _parseTc6POU(pouNode):
 
     f = lambda node, req, ns : list(node.find(req, ns)) if node.find(req, ns) != None else []
     if data.get('type') == 'function':
-        data['returnType'] = _parseTc6VarType(pouNode.find('./ns:interface/ns:returnType', ns))[1]
+        data['returnType'] = _parseTc6VarType(pouNode.find('./ns:interface/ns:returnType', ns), ns)[1]
 
     #Parameters and variables
-    data['if'] = _parseTc6Interface(pouNode)
+    data['if'] = _parseTc6Interface(pouNode, ns)
 
     #Get its code only if its structured text or instruction list (textual based language)
-    data['code'] = _extractTc6Code(pouNode)
+    data['code'] = _extractTc6Code(pouNode, ns)
 
     #Get actions
     data['actions'] = []
@@ -291,7 +404,7 @@ def _parseTc6POU(pouNode):
                 'name' : action.get('name'),
                 'code' : '' 
             }
-            act['code'] = _extractTc6Code(action)
+            act['code'] = _extractTc6Code(action, ns)
             data['actions'].append(act)
 
     
@@ -307,45 +420,45 @@ def _parseTc6POU(pouNode):
                     'description' : _extractTc6Docs(methodNode.find('./ns:interface/ns:documentation', ns))
                 }
                 if methodNode.find('./ns:interface/ns:returnType', ns) != None:
-                    method['returnType'] = _parseTc6VarType(methodNode.find('./ns:interface/ns:returnType', ns))[1]
+                    method['returnType'] = _parseTc6VarType(methodNode.find('./ns:interface/ns:returnType', ns), ns)[1]
 
-                method['code'] = _extractTc6Code(methodNode)
-                method['if'] = _parseTc6Interface(methodNode)
+                method['code'] = _extractTc6Code(methodNode, ns)
+                method['if'] = _parseTc6Interface(methodNode, ns)
 
                 data['methods'].append(method)
         
     return data
 
-def _parseTc6Interface(node):
+def _parseTc6Interface(node, ns):
     #Put interface in block depending on type
     data = []
     for block in list(node.find('./ns:interface', ns)):
         if block.tag.endswith('outputVars'):
-            data.append(_parseTc6VarBlock(block, 'VAR_OUTPUT'))
+            data.append(_parseTc6VarBlock(block, 'VAR_OUTPUT', ns))
             
         elif block.tag.endswith('inputVars'):
-            data.append(_parseTc6VarBlock(block, 'VAR_INPUT'))
+            data.append(_parseTc6VarBlock(block, 'VAR_INPUT', ns))
 
         elif block.tag.endswith('inOutVars'):
-            data.append(_parseTc6VarBlock(block, 'VAR_IN_OUT'))
+            data.append(_parseTc6VarBlock(block, 'VAR_IN_OUT', ns))
 
         elif block.tag.endswith('externalVars'):
-            data.append(_parseTc6VarBlock(block, 'VAR_EXTERNAL'))
+            data.append(_parseTc6VarBlock(block, 'VAR_EXTERNAL', ns))
 
         elif block.tag.endswith('tempVars'):
-            data.append(_parseTc6VarBlock(block, 'VAR_TEMP'))
+            data.append(_parseTc6VarBlock(block, 'VAR_TEMP', ns))
 
         elif block.tag.endswith('accessVars'):
-            data.append(_parseTc6VarBlock(block, 'VAR_ACCESS'))
+            data.append(_parseTc6VarBlock(block, 'VAR_ACCESS', ns))
 
         elif block.tag.endswith('globalVars'):
-            data.append(_parseTc6VarBlock(block, 'VAR_GLOBAL'))
+            data.append(_parseTc6VarBlock(block, 'VAR_GLOBAL', ns))
         
         elif block.tag.endswith('localVars'):
-            data.append(_parseTc6VarBlock(block, 'VAR'))
+            data.append(_parseTc6VarBlock(block, 'VAR', ns))
     return data
     
-def _parseTc6VarBlock(block, typ):
+def _parseTc6VarBlock(block, typ, ns):
     """Assembles a block out of a variable node"""
     varBlock = {
         'name' : typ,
@@ -371,11 +484,11 @@ def _parseTc6VarBlock(block, typ):
         varBlock['attribute'] = 'constant'
 
     #Get members
-    varBlock['vars'].extend([_parseTc6Var(var, varBlock['attribute']) for var in list(block)])
+    varBlock['vars'].extend([_parseTc6Var(var, varBlock['attribute'], ns) for var in list(block)])
     
     return varBlock
 
-def _parseTc6VarList(dtNode):
+def _parseTc6VarList(dtNode, ns):
     """Returns a dictionary of format:
     {
         'name' : 'Var List name',
@@ -418,12 +531,12 @@ def _parseTc6VarList(dtNode):
         dtSet['baseType'] = 'struct'
         dtSet['components'] = []
         for cpt in dtNode.findall('./ns:baseType/ns:struct/ns:variable', ns):
-            dtSet['components'].append(_parseTc6Var(cpt, ''))
+            dtSet['components'].append(_parseTc6Var(cpt, '', ns))
     
     elif baseType == 'array':
         #If its an datatype converted to array this is handled different and has no components
         dtSet['components'] = []
-        dtSet['baseType'] = _parseTc6Array(dtNode)
+        dtSet['baseType'] = _parseTc6Array(dtNode, ns)
 
     else:
         #This is some generic varlist or error
@@ -431,9 +544,9 @@ def _parseTc6VarList(dtNode):
 
     return dtSet
 
-def _parseTc6Array(node):
+def _parseTc6Array(node, ns):
     '''Takes in the root node of the type'''
-    derivedType = _parseTc6VarType(node.find('ns:baseType', ns))
+    derivedType = _parseTc6VarType(node.find('ns:baseType', ns), ns)
     dimNodes = node.findall('ns:dimension', ns)
     dimTxt = ''
     if dimNodes:
@@ -445,7 +558,7 @@ def _parseTc6Array(node):
         dimTxt += ']'
     return f"ARRAY{dimTxt} OF {derivedType[1]}"
        
-def _parseTc6VarType(node):
+def _parseTc6VarType(node, ns):
     """Parses type node and returns then name of the data type used
      in this variable. Returns a tuple"""
 
@@ -459,11 +572,11 @@ def _parseTc6VarType(node):
         ptr = node.find('ns:pointer', ns)
 
         #Find base type. Base type node is the same as type node
-        return ('pointer', f"POINTER TO {_parseTc6VarType(ptr.find('ns:baseType', ns))[1]}")
+        return ('pointer', f"POINTER TO {_parseTc6VarType(ptr.find('ns:baseType', ns), ns)[1]}")
 
     #Check if type is array
     elif node.find('ns:array', ns) != None:
-        return ('array', _parseTc6Array(node.find('ns:array', ns)))
+        return ('array', _parseTc6Array(node.find('ns:array', ns), ns))
 
     else:
         #It can only be a elementary value
@@ -473,7 +586,7 @@ def _parseTc6VarType(node):
             typ = f"STRING[{lenght}]"
         return ('elem', typ)
 
-def _parseTc6Var(var, attribute):
+def _parseTc6Var(var, attribute, ns):
     """Returns a dictionary of format:
     {
         'name' : 'variable name',
@@ -485,7 +598,7 @@ def _parseTc6Var(var, attribute):
     name = var.get('name')
 
     #Get name of the variable type: derived/array/simpleValue/pointer
-    typ = _parseTc6VarType(var.find('./ns:type', ns))
+    typ = _parseTc6VarType(var.find('./ns:type', ns), ns)
 
     #Check for initial value
 
@@ -531,7 +644,7 @@ def _extractTc6Docs(node):
     
     return ''
 
-def _extractTc6Code(node):
+def _extractTc6Code(node, ns):
     """Searches for ST or IL code inside of a pou node and returns it in a string format"""
     for codeType in ['./ns:body/ns:ST', './ns:body/ns:IL']:
         codeNode = node.find(codeType, ns)
@@ -582,24 +695,12 @@ def iec61131_10Parse(pathToXml, ignoredNs=()):
             Resources : [
         ]
     }"""
-    #Change namespaces to iec61131-10
-    ns['ns'] = r"www.iec.ch/public/TC65SC65BWG7TF10"
+    #Each parse uses its own namespace map with iec61131-10 so parses can run in parallel threads
+    ns = _nsMap(r"www.iec.ch/public/TC65SC65BWG7TF10")
 
     #Get project information
-    tree = ET.parse(pathToXml)
-    root = tree.getroot()
-    fileHeader = root.find('ns:FileHeader', ns)
-    contentHeader = root.find('ns:ContentHeader', ns)
-    data['info'] = {
-        'companyName' : fileHeader.get('companyName'),
-		'companyURL' : fileHeader.get('companyURL'),
-		'projectName' : contentHeader.get('name'),
-		'projectVersion' : contentHeader.get('version'),
-		'projectURL' : '',
-        'contactPerson' : contentHeader.get('author'),
-		'contentDescription' : fileHeader.get('contentDescription'),
-		'contentGenerated' : contentHeader.get('modificationDateTime'),
-    }
+    root = _getRoot(pathToXml)
+    data['info'] = _parseIecInfo(root.find('ns:FileHeader', ns), root.find('ns:ContentHeader', ns), ns)
 
     #Find global POUs and Data types
     gNsElement = root.find('./ns:Types/ns:GlobalNamespace', ns)
@@ -608,13 +709,13 @@ def iec61131_10Parse(pathToXml, ignoredNs=()):
     }
     
     #Find all global namespace programs (POUs)
-    gNsItem['prgs'] = [_parseIecPRG(prg) for prg in gNsElement.findall('ns:Program', ns)]
-    gNsItem['fbs'] = [_parseIecFB(fb) for fb in gNsElement.findall('ns:FunctionBlock', ns)]
-    gNsItem['fcs'] = [_parseIecFC(fc) for fc in gNsElement.findall('ns:Function', ns)]
+    gNsItem['prgs'] = [_parseIecPRG(prg, ns) for prg in gNsElement.findall('ns:Program', ns)]
+    gNsItem['fbs'] = [_parseIecFB(fb, ns) for fb in gNsElement.findall('ns:FunctionBlock', ns)]
+    gNsItem['fcs'] = [_parseIecFC(fc, ns) for fc in gNsElement.findall('ns:Function', ns)]
     gNsItem['class'] = [{} for _class in gNsElement.findall('ns:Class', ns)]
 
     #Find all global namespace data types
-    gNsItem['dts'] = [_parseIecDT(dt) for dt in gNsElement.findall('ns:DataTypeDecl', ns)]
+    gNsItem['dts'] = [_parseIecDT(dt, ns) for dt in gNsElement.findall('ns:DataTypeDecl', ns)]
 
     #Find all global variables
     gNsItem['var'] = []
@@ -627,13 +728,13 @@ def iec61131_10Parse(pathToXml, ignoredNs=()):
             'name' : nameSpace.get('name')
         }
         #Find all namespace programs (POUs)
-        nsItem['prgs'] = [_parseIecPRG(prg) for prg in nameSpace.findall('ns:Program', ns)]
-        nsItem['fbs'] = [_parseIecFB(fb) for fb in nameSpace.findall('ns:FunctionBlock', ns)]
-        nsItem['fcs'] = [_parseIecFC(fc) for fc in nameSpace.findall('ns:Function', ns)]
+        nsItem['prgs'] = [_parseIecPRG(prg, ns) for prg in nameSpace.findall('ns:Program', ns)]
+        nsItem['fbs'] = [_parseIecFB(fb, ns) for fb in nameSpace.findall('ns:FunctionBlock', ns)]
+        nsItem['fcs'] = [_parseIecFC(fc, ns) for fc in nameSpace.findall('ns:Function', ns)]
         nsItem['class'] = [{} for _class in nameSpace.findall('ns:Class', ns)]
 
         #Find all namespace data types
-        nsItem['dts'] = [_parseIecDT(dt) for dt in nameSpace.findall('ns:DataTypeDecl', ns)]
+        nsItem['dts'] = [_parseIecDT(dt, ns) for dt in nameSpace.findall('ns:DataTypeDecl', ns)]
         nsItem['var'] = []
 
         if nsItem['name'] not in ignoredNs:
@@ -641,7 +742,65 @@ def iec61131_10Parse(pathToXml, ignoredNs=()):
 
     return data
 
-def _parseIecFB(pouNode):
+def _parseIecInfo(fileHeader, contentHeader, ns):
+    """Returns the project information dictionary from the FileHeader and ContentHeader nodes"""
+    return {
+        'companyName' : fileHeader.get('companyName'),
+		'companyURL' : fileHeader.get('companyURL'),
+		'projectName' : contentHeader.get('name'),
+		'projectVersion' : contentHeader.get('version'),
+		'projectURL' : '',
+        'contactPerson' : contentHeader.get('author'),
+		'contentDescription' : fileHeader.get('contentDescription'),
+		'contentGenerated' : contentHeader.get('modificationDateTime'),
+    }
+
+def iterIec61131_10(pathToXml, ignoredNs=()):
+    """Generator version of iec61131_10Parse built on iterparse. Programs, function blocks, functions, classes and data types
+    are handled in one forward pass, yielded as soon as their closing tag is seen and then freed,
+    so memory is bounded by the largest element instead of the document.
+    Yields tuples of (namespace name, category, item):
+        (None, 'info', info) - project information, comes first
+        (namespace name, 'prgs' | 'fbs' | 'fcs' | 'class' | 'dts', item) - item has the same format as in iec61131_10Parse
+    Namespaces without any of these elements are not reported"""
+    #Each parse uses its own namespace map with iec61131-10 so parses can run in parallel threads
+    ns = _nsMap(r"www.iec.ch/public/TC65SC65BWG7TF10")
+
+    parsers = {
+        'Program' : ('prgs', _parseIecPRG),
+        'FunctionBlock' : ('fbs', _parseIecFB),
+        'Function' : ('fcs', _parseIecFC),
+        'Class' : ('class', lambda node, ns : {}),
+        'DataTypeDecl' : ('dts', _parseIecDT)
+    }
+    tags = [f"{{{ns['ns']}}}{tag}" for tag in ('ContentHeader', 'NamespaceDecl', *parsers)]
+    for _, elem in etree.iterparse(pathToXml, events=('end',), tag=tags, remove_comments=True, remove_pis=True, huge_tree=True, resolve_entities=False):
+        tag = etree.QName(elem).localname
+        if tag == 'ContentHeader':
+            yield None, 'info', _parseIecInfo(elem.getparent().find('ns:FileHeader', ns), elem, ns)
+            continue
+        if tag == 'NamespaceDecl':
+            #All of its content was handled already
+            _freeElement(elem)
+            continue
+
+        #Same as iec61131_10Parse, only the global namespace and namespaces declared directly in it are parsed
+        parent = elem.getparent()
+        nsName = None
+        if _localName(parent) == 'GlobalNamespace':
+            nsName = 'Global'
+        elif _localName(parent) == 'NamespaceDecl' and _localName(parent.getparent()) == 'GlobalNamespace':
+            if parent.get('name') not in ignoredNs:
+                nsName = parent.get('name')
+
+        if nsName != None:
+            category, parser = parsers[tag]
+            item = parser(elem, ns)
+        _freeElement(elem)
+        if nsName != None:
+            yield nsName, category, item
+
+def _parseIecFB(pouNode, ns):
     """Returns a dictionary of format:
     {
         'name' : 'POU name',
@@ -680,47 +839,47 @@ def _parseIecFB(pouNode):
     data['if'] = []
 
     #Put interface in block depending on type
-    if pouNode.find('./ns:Parameters/ns:OutputVars', ns):
+    if f(pouNode, './ns:Parameters/ns:OutputVars', ns):
         data['if'].append(
             {
               'name' : 'VAR_OUTPUT',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(pouNode, './ns:Parameters/ns:OutputVars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(pouNode, './ns:Parameters/ns:OutputVars', ns)]
               })
-    if pouNode.find('./ns:Parameters/ns:InoutVars', ns):
+    if f(pouNode, './ns:Parameters/ns:InoutVars', ns):
         data['if'].append(
             {
               'name' : 'VAR_IN_OUT',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(pouNode, './ns:Parameters/ns:InoutVars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(pouNode, './ns:Parameters/ns:InoutVars', ns)]
               })
-    if pouNode.find('./ns:Parameters/ns:InputVars', ns):
+    if f(pouNode, './ns:Parameters/ns:InputVars', ns):
         data['if'].append(
             {
               'name' : 'VAR_INPUT',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(pouNode, './ns:Parameters/ns:InputVars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(pouNode, './ns:Parameters/ns:InputVars', ns)]
               })
-    if pouNode.find('ns:Vars', ns):
+    if f(pouNode, 'ns:Vars', ns):
         data['if'].append(
             {
               'name' : 'VAR',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(pouNode, 'ns:Vars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(pouNode, 'ns:Vars', ns)]
               })
-    if pouNode.find('ns:TempVars', ns):
+    if f(pouNode, 'ns:TempVars', ns):
         data['if'].append(
             {
               'name' : 'VAR_TEMP',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(pouNode, 'ns:TempVars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(pouNode, 'ns:TempVars', ns)]
               })
-    if pouNode.find('ns:ExternalVars', ns):
+    if f(pouNode, 'ns:ExternalVars', ns):
         data['if'].append(
             {
               'name' : 'VAR_EXTERNAL',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(pouNode, 'ns:ExternalVars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(pouNode, 'ns:ExternalVars', ns)]
               })
 
     data['actions'] = []
@@ -739,7 +898,7 @@ def _parseIecFB(pouNode):
 
     return data
 
-def _parseIecFC(fcNode):
+def _parseIecFC(fcNode, ns):
     """Returns a dictionary of format:
     { 
         'name' : 'POU name',
@@ -776,45 +935,45 @@ def _parseIecFC(fcNode):
     data['if'] = []
 
     #Put interface in block depending on type
-    if fcNode.find('./ns:Parameters/ns:OutputVars', ns):
+    if f(fcNode, './ns:Parameters/ns:OutputVars', ns):
         data['if'].append(
             {
               'name' : 'VAR_OUTPUT',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(fcNode, './ns:Parameters/ns:OutputVars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(fcNode, './ns:Parameters/ns:OutputVars', ns)]
               })
-    if fcNode.find('./ns:Parameters/ns:InoutVars', ns):
+    if f(fcNode, './ns:Parameters/ns:InoutVars', ns):
         data['if'].append(
             {
               'name' : 'VAR_IN_OUT',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(fcNode, './ns:Parameters/ns:InoutVars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(fcNode, './ns:Parameters/ns:InoutVars', ns)]
               })
-    if fcNode.find('./ns:Parameters/ns:InputVars', ns):
+    if f(fcNode, './ns:Parameters/ns:InputVars', ns):
         data['if'].append(
             {
               'name' : 'VAR_INPUT',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(fcNode, './ns:Parameters/ns:InputVars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(fcNode, './ns:Parameters/ns:InputVars', ns)]
               })
-    if fcNode.find('ns:TempVars', ns):
+    if f(fcNode, 'ns:TempVars', ns):
         data['if'].append(
             {
               'name' : 'VAR_TEMP',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(fcNode, 'ns:TempVars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(fcNode, 'ns:TempVars', ns)]
               })
-    if fcNode.find('ns:ExternalVars', ns):
+    if f(fcNode, 'ns:ExternalVars', ns):
         data['if'].append(
             {
               'name' : 'VAR_EXTERNAL',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(fcNode, 'ns:ExternalVars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(fcNode, 'ns:ExternalVars', ns)]
               })
 
     return data
 
-def _parseIecPRG(prgNode):
+def _parseIecPRG(prgNode, ns):
     """Returns a dictionary that represents a PRG"""
     data = {
         'name' : prgNode.get('name'),
@@ -835,61 +994,61 @@ def _parseIecPRG(prgNode):
     data['if'] = []
 
     #Put interface in block depending on type
-    if prgNode.find('./ns:Parameters/ns:OutputVars', ns):
+    if f(prgNode, './ns:Parameters/ns:OutputVars', ns):
         data['if'].append(
             {
               'name' : 'VAR_OUTPUT',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(prgNode, './ns:Parameters/ns:OutputVars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(prgNode, './ns:Parameters/ns:OutputVars', ns)]
               })
-    if prgNode.find('./ns:Parameters/ns:InoutVars', ns):
+    if f(prgNode, './ns:Parameters/ns:InoutVars', ns):
         data['if'].append(
             {
               'name' : 'VAR_IN_OUT',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(prgNode, './ns:Parameters/ns:InoutVars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(prgNode, './ns:Parameters/ns:InoutVars', ns)]
               })
-    if prgNode.find('./ns:Parameters/ns:InputVars', ns):
+    if f(prgNode, './ns:Parameters/ns:InputVars', ns):
         data['if'].append(
             {
               'name' : 'VAR_INPUT',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(prgNode, './ns:Parameters/ns:InputVars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(prgNode, './ns:Parameters/ns:InputVars', ns)]
               })
-    if prgNode.find('ns:Vars', ns):
+    if f(prgNode, 'ns:Vars', ns):
         data['if'].append(
             {
               'name' : 'VAR',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(prgNode, 'ns:Vars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(prgNode, 'ns:Vars', ns)]
               })
-    if prgNode.find('ns:TempVars', ns):
+    if f(prgNode, 'ns:TempVars', ns):
         data['if'].append(
             {
               'name' : 'VAR_TEMP',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(prgNode, 'ns:TempVars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(prgNode, 'ns:TempVars', ns)]
               })
-    if prgNode.find('ns:ExternalVars', ns):
+    if f(prgNode, 'ns:ExternalVars', ns):
         data['if'].append(
             {
               'name' : 'VAR_EXTERNAL',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(prgNode, 'ns:ExternalVars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(prgNode, 'ns:ExternalVars', ns)]
               })
-    if prgNode.find('ns:GlobalVars', ns):
+    if f(prgNode, 'ns:GlobalVars', ns):
         data['if'].append(
             {
               'name' : 'VAR_GLOBAL',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(prgNode, 'ns:GlobalVars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(prgNode, 'ns:GlobalVars', ns)]
               })
-    if prgNode.find('ns:AccessVars', ns):
+    if f(prgNode, 'ns:AccessVars', ns):
         data['if'].append(
             {
               'name' : 'VAR_ACCESS',
               'attribute' : '',
-              'vars' : [_parseIecVar(var) for var in f(prgNode, 'ns:AccessVars', ns)]
+              'vars' : [_parseIecVar(var, ns) for var in f(prgNode, 'ns:AccessVars', ns)]
               })
     
     data['actions'] = []
@@ -908,7 +1067,7 @@ def _parseIecPRG(prgNode):
     
     return data
 
-def _parseIecVar(varNode):
+def _parseIecVar(varNode, ns):
     """Returns a dictionary of format:
     {
         'name' : 'variable name',
@@ -934,7 +1093,7 @@ def _parseIecVar(varNode):
         data['description'] = varNode.find('./ns:Documentation', ns).text
     return data
 
-def _parseIecDT(dtNode):
+def _parseIecDT(dtNode, ns):
     """Returns a dictionary of format:
     {
         'name' : 'data type name',
@@ -969,7 +1128,7 @@ def _parseIecDT(dtNode):
     elif dtSet.get('baseType') == 'struct':
         #If data type has variable components then this
         for cpt in dtNode.findall('./ns:baseType/ns:struct/ns:variable', ns):
-            dtSet['components'].append(_parseIecVar(cpt))
+            dtSet['components'].append(_parseIecVar(cpt, ns))
     else:
         pass
 
@@ -0,0 +1,277 @@
+import re
+from collections import Counter
+from functools import lru_cache
+
+#Cross reference index of a parsed project. Definitions and references of POUs, data types, global variables and actions
+#are kept per symbol name so a lookup is a single dictionary access. Names are case insensitive like IEC 61131-3 identifiers.
+#A location is a tuple (namespace, pou, line, column):
+#   pou - name of the POU, 'POU.Action' or 'POU.Method' for code of actions and methods, name of the data type or global var list
+#       for their declarations
+#   line, column - 1 based position in the code, None for declarations that have no code position, like the types of interface variables
+#Every item of a namespace list is indexed on its own, so changing one POU only indexes that POU again.
+
+#Comments and strings are matched as a whole so identifiers in them are skipped. Identifiers are matched with the chain of members after them,
+#identifiers after a . (members), before a # (typed literals like T#5s) or after a digit or # (numbers like 16#FF) are not symbols.
+#The identifier with its members is captured in a lookahead and matched by backreferences, so it cant backtrack to a shorter
+#identifier that isnt followed by a #. A lookahead doesnt backtrack once it matched, possessive quantifiers need python 3.11
+RX_TOKEN = re.compile(
+    r'\(\*.*?(?:\*\)|$)|/\*.*?(?:\*/|$)|//[^\n]*'
+    r"|'(?:\$.|[^'$\n])*'|\"(?:[$\\].|[^\"$\\\n])*\""
+    r'|(?<![\w.#])(?=(?P<Name>[A-Za-z_]\w*)(?P<Members>(?:\.[A-Za-z_]\w*)*))(?P=Name)(?P=Members)(?!#)', re.S)
+
+#Keywords and elementary data types of structured text are never symbols and are not indexed
+KEYWORDS = frozenset(keyword.lower() for keyword in (
+    'IF', 'THEN', 'ELSIF', 'ELSE', 'END_IF', 'CASE', 'OF', 'END_CASE', 'FOR', 'TO', 'BY', 'DO', 'END_FOR', 'WHILE', 'END_WHILE',
+    'REPEAT', 'UNTIL', 'END_REPEAT', 'EXIT', 'CONTINUE', 'RETURN', 'AND', 'OR', 'XOR', 'NOT', 'MOD', 'AND_THEN', 'OR_ELSE',
+    'TRUE', 'FALSE', 'ARRAY', 'POINTER', 'REFERENCE', 'REF_TO', 'THIS', 'SUPER', 'VAR', 'END_VAR',
+    'BOOL', 'BYTE', 'WORD', 'DWORD', 'LWORD', 'SINT', 'INT', 'DINT', 'LINT', 'USINT', 'UINT', 'UDINT', 'ULINT', 'REAL', 'LREAL',
+    'TIME', 'LTIME', 'DATE', 'LDATE', 'TIME_OF_DAY', 'TOD', 'LTIME_OF_DAY', 'LTOD', 'DATE_AND_TIME', 'DT', 'LDATE_AND_TIME', 'LDT',
+    'STRING', 'WSTRING', 'CHAR', 'WCHAR', 'ANY', 'ANY_NUM', 'ANY_INT', 'ANY_REAL', 'ANY_BIT', 'ANY_STRING', 'ANY_DATE'))
+
+#Namespace lists with POUs
+POU_CATEGORIES = ('prgs', 'fbs', 'fcs', 'class')
+#Namespace lists with global var lists, var lists keep their variables in 'vars' or 'components'
+VAR_CATEGORIES = ('vars', 'var')
+
+def iterIdentifiers(code, qualifiers=()):
+    """Yields tuples of (identifier, offset) of the identifiers in code that can be symbols. Comments, strings, keywords and members
+    are skipped. The member of an identifier in qualifiers, lower case namespace names, is yielded as well so MyNs.FB_Valve is a use of FB_Valve"""
+    for match in RX_TOKEN.finditer(code):
+        name = match.group('Name')
+        if name == None:
+            continue
+        lowerName = name.lower()
+        if lowerName not in KEYWORDS:
+            yield name, match.start()
+        if lowerName in qualifiers and match.group('Members'):
+            member = match.group('Members')[1:].split('.', 1)[0]
+            yield member, match.start() + len(name) + 1
+
+def findUsages(data, identifiers):
+    """Searches the code of every POU, action and method of a project for many identifiers at once and returns a usage matrix
+        {identifier : {(namespace, pou) : number of uses}}
+    pou is 'POU.Action' or 'POU.Method' for actions and methods. Every identifier is a key, identifiers that are never used have an empty dictionary.
+    Matching is case insensitive on whole identifiers, comments, strings and members are skipped like in XRef.
+    Variables declared in the interface of a POU or method are local like in XRef. A local hides a POU, data type or global variable
+    with its name, so it is not a use of that declaration, uses of identifiers that are declared only locally are counted.
+    Every code body is tokenized once and every identifier is looked up in a set, so the cost doesnt grow with the number of identifiers.
+    data is a parse result, a dictionary or a pyPlcXml.Project"""
+    if not isinstance(data, dict):
+        data = data.toDict()
+    usages = {identifier : {} for identifier in identifiers}
+    #Identifiers that differ only in case are the same identifier
+    wanted = {}
+    for identifier in usages:
+        wanted.setdefault(identifier.lower(), []).append(identifier)
+    qualifiers = {str(namespace.get('name')).lower() for namespace in data.get('namespaces', [])}
+    namespaceNames = _namespaceNames(data)
+
+    for nsName, pouName, code, localNames in _codeBodies(data):
+        counts = Counter(_lowerIdentifiers(code, qualifiers))
+        for lowerName in wanted.keys() & counts.keys() - (localNames & namespaceNames):
+            for identifier in wanted[lowerName]:
+                usages[identifier][(nsName, pouName)] = counts[lowerName]
+    return usages
+
+class XRef:
+    """Index of the definitions and references of the symbols of a project
+
+        xref = XRef.fromProject(pyPlcXml.parse(path))
+        xref.references('FB_Valve')
+        xref.update('MyNs', 'fbs', changedPou)
+    """
+
+    def __init__(self):
+        #Lower case symbol name to {item key : [locations]}
+        self._definitions = {}
+        self._references = {}
+        #Item key to the lower case names it defines and references, used to remove an item
+        self._items = {}
+        #Lower case namespace names, qualified names of these namespaces are resolved
+        self._namespaces = set()
+
+    @classmethod
+    def fromProject(cls, data):
+        """Returns the index of a parse result, a dictionary or a pyPlcXml.Project"""
+        if not isinstance(data, dict):
+            data = data.toDict()
+        xref = cls()
+        xref._namespaces.update(str(namespace.get('name')).lower() for namespace in data.get('namespaces', []))
+        for namespace in data.get('namespaces', []):
+            for category, items in namespace.items():
+                if isinstance(items, list):
+                    for item in items:
+                        if isinstance(item, dict):
+                            xref.update(namespace.get('name'), category, item)
+        return xref
+
+    @classmethod
+    def fromItems(cls, items):
+        """Returns the index of (namespace name, category, item) tuples like iterTc6, iterIec61131_10 and iterLines yield"""
+        xref = cls()
+        for nsName, category, item in items:
+            if nsName != None and category != 'namespace':
+                xref.update(nsName, category, item)
+        return xref
+
+    def update(self, nsName, category, item):
+        """Indexes an item of a namespace list like 'fbs' or 'dts' in the dictionary format, an item with the same name
+        that was indexed before is replaced. Items of other lists are ignored"""
+        if not isinstance(item, dict):
+            item = item.toDict()
+        name = item.get('name')
+        self.remove(nsName, category, name)
+        self._namespaces.add(str(nsName).lower())
+        key = _itemKey(nsName, category, name)
+        definitions = []
+        references = []
+        if category in POU_CATEGORIES:
+            definitions.append((name, (nsName, name, None, None)))
+            for action in item.get('actions') or []:
+                definitions.append((action.get('name'), (nsName, name, None, None)))
+            localNames = _declare(references, nsName, name, item.get('if'))
+            self._code(references, nsName, name, item.get('code'), localNames)
+            for action in item.get('actions') or []:
+                self._code(references, nsName, f"{name}.{action.get('name')}", action.get('code'), localNames)
+            for method in item.get('methods') or []:
+                methodName = f"{name}.{method.get('name')}"
+                methodLocals = localNames | _declare(references, nsName, methodName, method.get('if'))
+                self._code(references, nsName, methodName, method.get('code'), methodLocals)
+        elif category == 'dts':
+            definitions.append((name, (nsName, name, None, None)))
+            _declare(references, nsName, name, [{'vars' : item.get('components') or []}])
+        elif category in VAR_CATEGORIES:
+            variables = item.get('vars', item.get('components')) or []
+            for var in variables:
+                definitions.append((var.get('name'), (nsName, name, None, None)))
+            _declare(references, nsName, name, [{'vars' : variables}])
+        else:
+            return
+
+        self._items[key] = (_add(self._definitions, key, definitions), _add(self._references, key, references))
+
+    def remove(self, nsName, category, name):
+        """Removes an item from the index, returns False if it was not indexed"""
+        key = _itemKey(nsName, category, name)
+        if key not in self._items:
+            return False
+        definitionNames, referenceNames = self._items.pop(key)
+        _discard(self._definitions, key, definitionNames)
+        _discard(self._references, key, referenceNames)
+        return True
+
+    def definitions(self, name):
+        """Returns a list of the locations where a symbol is defined"""
+        return [location for locations in self._definitions.get(name.lower(), {}).values() for location in locations]
+
+    def references(self, name):
+        """Returns a list of the locations where a symbol is used"""
+        return [location for locations in self._references.get(name.lower(), {}).values() for location in locations]
+
+    def symbols(self):
+        """Returns a list of the lower case names of all defined symbols"""
+        return list(self._definitions)
+
+    def unused(self):
+        """Returns a list of the lower case names of defined symbols without references"""
+        return [name for name in self._definitions if name not in self._references]
+
+    def _code(self, references, nsName, pouName, code, localNames):
+        """Adds the references in code, identifiers declared in the POU are local and not references of symbols"""
+        if not code:
+            return
+        line = 1
+        last = 0
+        for name, offset in iterIdentifiers(code, self._namespaces):
+            if name.lower() in localNames:
+                continue
+            line += code.count('\n', last, offset)
+            last = offset
+            references.append((name, (nsName, pouName, line, offset - code.rfind('\n', 0, offset))))
+
+def _codeBodies(data):
+    """Yields tuples of (namespace name, pou name, code, local names) of every code body of the POUs of a project.
+    local names is a set of the lower case names of the variables declared for the body, methods add their own to the POU ones"""
+    for namespace in data.get('namespaces', []):
+        nsName = namespace.get('name')
+        for category in POU_CATEGORIES:
+            for pou in namespace.get(category) or []:
+                name = pou.get('name')
+                localNames = _localNames(pou.get('if'))
+                if pou.get('code'):
+                    yield nsName, name, pou['code'], localNames
+                for action in pou.get('actions') or []:
+                    if action.get('code'):
+                        yield nsName, f"{name}.{action.get('name')}", action['code'], localNames
+                for method in pou.get('methods') or []:
+                    if method.get('code'):
+                        yield nsName, f"{name}.{method.get('name')}", method['code'], localNames | _localNames(method.get('if'))
+
+def _namespaceNames(data):
+    """Returns a set of the lower case names declared at namespace level, the items of the namespace lists like POUs
+    and data types and the variables of global var lists"""
+    names = set()
+    for namespace in data.get('namespaces', []):
+        for category, items in namespace.items():
+            if not isinstance(items, list):
+                continue
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                names.add(str(item.get('name')).lower())
+                if category in VAR_CATEGORIES:
+                    names.update(str(var.get('name')).lower() for var in item.get('vars', item.get('components')) or [])
+    return names
+
+def _lowerIdentifiers(code, qualifiers):
+    """Returns a list of the lower case identifiers in code, same as iterIdentifiers without offsets and with keywords"""
+    names = []
+    for name, members in RX_TOKEN.findall(code):
+        if name:
+            name = name.lower()
+            names.append(name)
+            if members and name in qualifiers:
+                names.append(members[1:].split('.', 1)[0].lower())
+    return names
+
+def _localNames(interface):
+    """Returns a set of the lower case names of the variables of an interface"""
+    return {str(var.get('name')).lower() for block in interface or [] for var in block.get('vars') or []}
+
+def _declare(references, nsName, pouName, interface):
+    """Adds the identifiers in the types of the variables of an interface as references without position.
+    Returns a set of the lower case names of the variables"""
+    localNames = set()
+    for block in interface or []:
+        for var in block.get('vars') or []:
+            localNames.add(str(var.get('name')).lower())
+            for name in _typeIdentifiers(var.get('type') or ''):
+                references.append((name, (nsName, pouName, None, None)))
+    return localNames
+
+@lru_cache(maxsize=4096)
+def _typeIdentifiers(typ):
+    """Returns a tuple of the identifiers in a type, projects use the same types over and over"""
+    return tuple(name for name, offset in iterIdentifiers(typ))
+
+def _itemKey(nsName, category, name):
+    #POUs share one key space, a program and a function block cant have the same name
+    return (nsName, 'pou' if category in POU_CATEGORIES else category, name)
+
+def _add(index, key, entries):
+    """Adds (name, location) entries of an item to an index and returns the lower case names"""
+    names = set()
+    for name, location in entries:
+        if name == None:
+            continue
+        lowerName = name.lower()
+        index.setdefault(lowerName, {}).setdefault(key, []).append(location)
+        names.add(lowerName)
+    return names
+
+def _discard(index, key, names):
+    for name in names:
+        locations = index[name]
+        del locations[key]
+        if not locations:
+            del index[name]
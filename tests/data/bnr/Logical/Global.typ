@@ -0,0 +1,14 @@
+
+TYPE
+	ST_DataG : 	STRUCT (*struct desc*)
+		x : INT := 5; (*x desc*)
+		y : {REDUND_UNREPLICABLE} REAL; (*y*)
+		z : ARRAY[0..9]OF BOOL;
+	END_STRUCT;
+	E_ModeG : 
+		( (*enum desc*)
+		MODE_A := 0, (*a*)
+		MODE_B, (*b*)
+		MODE_C
+		) := MODE_A;
+END_TYPE
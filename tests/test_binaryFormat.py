@@ -0,0 +1,85 @@
+import builtins, io, os
+import pytest
+import pyPlcXml
+from pyPlcXml import binaryFormat
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+@pytest.fixture
+def dumped(tmp_path):
+    path = str(tmp_path / 'project.plcx')
+    pyPlcXml.dump(pyPlcXml.parse(os.path.join(DATA, 'v201.xml')), path)
+    with open(path, 'rb') as f:
+        return path, f.read()
+
+@pytest.fixture
+def openedFiles(monkeypatch):
+    files = []
+    def recordingOpen(*args, **kwargs):
+        files.append(builtins.open(*args, **kwargs))
+        return files[-1]
+    monkeypatch.setattr(binaryFormat, 'open', recordingOpen, raising=False)
+    return files
+
+def _damaged(content):
+    """Returns damaged copies of a dumped project by name"""
+    tocOffset, tocLength, tableOffset, tableLength, magic = binaryFormat._TRAILER.unpack_from(content, len(content) - binaryFormat._TRAILER.size)
+    trailer = lambda offset, length: content[:-binaryFormat._TRAILER.size] + binaryFormat._TRAILER.pack(offset, length, tableOffset, tableLength, magic)
+    nsName, nsTocOffset, nsTocLength = binaryFormat.ProjectStore(buffer=content)._toc[0]
+    return {
+        'truncated' : content[:len(content) // 2],
+        'garbage table of contents' : content[:tocOffset] + b'\xff' * tocLength + content[tocOffset + tocLength:],
+        'table of contents cut short' : trailer(tocOffset, tocLength // 2),
+        'table of contents of the wrong shape' : trailer(nsTocOffset, nsTocLength),
+        'table of contents in the header' : trailer(0, binaryFormat._HEADER.size),
+        'garbage value table' : content[:tableOffset] + b'\xff' * tableLength + content[tableOffset + tableLength:],
+        'value table of the wrong shape' : content[:tableOffset] + b'[]'.ljust(tableLength) + content[tableOffset + tableLength:],
+    }
+
+@pytest.mark.parametrize('damage', ['truncated', 'garbage table of contents', 'table of contents cut short',
+    'table of contents of the wrong shape', 'table of contents in the header', 'garbage value table', 'value table of the wrong shape'])
+def test_damaged_file_raises_value_error_and_is_closed(damage, dumped, tmp_path, openedFiles):
+    path, content = dumped
+    damaged = _damaged(content)[damage]
+    damagedPath = str(tmp_path / 'damaged.plcx')
+    with open(damagedPath, 'wb') as f:
+        f.write(damaged)
+    with pytest.raises(ValueError):
+        binaryFormat.ProjectStore(damagedPath)
+    assert openedFiles and all(f.closed for f in openedFiles)
+    with pytest.raises(ValueError):
+        pyPlcXml.load(io.BytesIO(damaged))
+
+def test_repeated_strings_are_stored_once(dumped):
+    path, content = dumped
+    data = pyPlcXml.load(path)
+    types = [var['type'] for namespace in data['namespaces'] for pou in namespace.get('prgs', []) + namespace.get('fbs', [])
+             for block in pou['if'] for var in block['vars']]
+    assert types.count('BOOL') > 1
+    assert content.count(b'"BOOL"') == 1
+    assert content.count(b'"description"') == 1
+
+def test_value_types_round_trip():
+    data = {'info' : {'int' : -3, 'big' : 2 ** 70, 'float' : 1.0, 'negativeZero' : -0.0, 'bool' : True, 'none' : None,
+                      'tuple' : (1, 'a', ()), 'empty' : [{}, []], 'text' : 'Ä\n"'},
+            'namespaces' : [{'name' : 'Ns', 'prgs' : [{'name' : 'P', 'values' : [1, True, 1.0, 0, False]}], 'vars' : []}]}
+    f = io.BytesIO()
+    pyPlcXml.dump(data, f)
+    loaded = pyPlcXml.load(io.BytesIO(f.getvalue()))
+    assert loaded == data
+    assert [type(value) for value in loaded['namespaces'][0]['prgs'][0]['values']] == [int, bool, float, int, bool]
+    assert str(loaded['info']['negativeZero']) == '-0.0' and loaded['info']['tuple'] == (1, 'a', ())
+
+@pytest.mark.parametrize('data', [{'info' : {1 : 'x'}}, {'info' : {'x' : object()}}])
+def test_unsupported_values_raise_type_error(data):
+    with pytest.raises(TypeError):
+        pyPlcXml.dump(data, io.BytesIO())
+
+def test_binary_files_are_recognized_by_extension_only(dumped, tmp_path):
+    path, content = dumped
+    assert pyPlcXml.parse(path)['namespaces']
+    for name in ('project', 'project.bin'):
+        renamed = tmp_path / name
+        renamed.write_bytes(content)
+        assert pyPlcXml.validate(str(renamed)) == None
+        assert pyPlcXml.parse(str(renamed)) == None
@@ -0,0 +1,33 @@
+import os, shutil
+import pyPlcXml
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+def test_symlink_cycle_is_not_followed(tmp_path):
+    project = tmp_path / 'bnr'
+    shutil.copytree(os.path.join(DATA, 'bnr'), project)
+    expected = pyPlcXml.parse(str(project / 'Proj.apj'))['namespaces']
+    #A link back to the project root and a link to a directory named like a B&R file
+    os.symlink(project / 'Logical', project / 'Logical' / 'Programs' / 'Main0' / 'Loop')
+    os.symlink(project / 'Logical' / 'Libraries', project / 'Logical' / 'Linked.typ')
+    assert pyPlcXml.parse(str(project / 'Proj.apj'))['namespaces'] == expected
+
+def test_cache_of_another_version_is_not_used(tmp_path, monkeypatch):
+    from pyPlcXml import brParser
+    path = os.path.join(DATA, 'bnr', 'Proj.apj')
+    cache = str(tmp_path / 'bnr.cache')
+    parsed = []
+    parseNs = brParser._parseNs
+    monkeypatch.setattr(brParser, '_parseNs', lambda *args, **kwargs: parsed.append(1) or parseNs(*args, **kwargs))
+
+    expected = pyPlcXml.parse(path, cache=cache)['namespaces']
+    assert len(parsed) == 4
+    assert pyPlcXml.parse(path, cache=cache)['namespaces'] == expected
+    assert len(parsed) == 4
+
+    monkeypatch.setattr(brParser, '__version__', 'other')
+    assert pyPlcXml.parse(path, cache=cache)['namespaces'] == expected
+    assert len(parsed) == 8
+    #The cache was written again by this version
+    assert pyPlcXml.parse(path, cache=cache)['namespaces'] == expected
+    assert len(parsed) == 8
@@ -0,0 +1,28 @@
+import pyPlcXml
+from pyPlcXml.helpers import _countLines
+
+CODE = '''(* header
+   comment *)
+x := 1; // trailing
+
+y := 2; (* inline *)
+// line comment
+'''
+
+def test_count_lines_matches_line_metrics():
+    metrics = pyPlcXml.lineMetrics(CODE)
+    assert metrics == {'code' : 2, 'comment' : 3, 'blank' : 1, 'total' : 6}
+    assert _countLines(CODE) == (metrics['code'], metrics['comment'], metrics['total'])
+
+def test_count_lines_unterminated_comment():
+    assert _countLines('x := 1;\n(* open\nstill open') == (1, 2, 3)
+    assert _countLines('x := 1;\n(* open') == (1, 1, 2)
+    assert pyPlcXml.lineMetrics('x := 1;\n(* open\nstill open')['comment'] == 2
+
+def test_count_lines_comment_followed_by_code():
+    assert _countLines('(* c *) x := 1;\n// only a comment\n') == (1, 1, 2)
+    assert _countLines('(* a (* nested *)\nstill comment *) y := 2;\n') == (1, 1, 2)
+
+def test_line_metrics_nested_comment():
+    metrics = pyPlcXml.lineMetrics('(* a (* nested *)\nstill comment *)\nx := 1; (* c *) y := 2;\n')
+    assert (metrics['code'], metrics['comment'], metrics['total']) == (1, 2, 3)
@@ -0,0 +1,27 @@
+import os
+from pyPlcXml import parseCache
+
+def _cacheSize(cacheDir):
+    return sum(entry.stat().st_size for entry in os.scandir(cacheDir) if entry.name.endswith('.pickle'))
+
+def test_directory_is_scanned_every_interval(tmp_path, monkeypatch):
+    cacheDir = str(tmp_path / 'cache')
+    scans = []
+    evict = parseCache._evict
+    monkeypatch.setattr(parseCache, '_evict', lambda *args: scans.append(1) or evict(*args))
+    writes = 2 * parseCache.EVICT_INTERVAL + 1
+    for i in range(writes):
+        parseCache.storeCached(cacheDir, f'key{i}', {'i' : i})
+    #The first write scans, then one scan per interval
+    assert len(scans) == 3
+    assert all(parseCache.loadCached(cacheDir, f'key{i}') == {'i' : i} for i in range(writes))
+
+def test_size_limit_is_kept(tmp_path):
+    cacheDir = str(tmp_path / 'cache')
+    data = {'code' : 'x' * 1000}
+    maxSize = 5000
+    for i in range(20):
+        parseCache.storeCached(cacheDir, f'key{i}', data, maxSize)
+        assert _cacheSize(cacheDir) <= maxSize
+    #The most recent entry is kept
+    assert parseCache.loadCached(cacheDir, 'key19') == data
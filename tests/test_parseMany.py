@@ -0,0 +1,109 @@
+import multiprocessing, os, shutil, time
+from concurrent.futures.process import BrokenProcessPool
+import pytest
+import pyPlcXml
+from pyPlcXml import main
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+@pytest.fixture
+def hangingBatch(tmp_path):
+    """A fifo that blocks parse forever when it is opened, followed by 4 good files"""
+    hang = tmp_path / 'hang.xml'
+    os.mkfifo(hang)
+    good = []
+    for i in range(4):
+        path = tmp_path / f'good{i}.xml'
+        shutil.copy(os.path.join(DATA, 'v201.xml'), path)
+        good.append(str(path))
+    yield str(hang), good
+    #Lets a hung reader finish
+    try:
+        fd = os.open(hang, os.O_WRONLY | os.O_NONBLOCK)
+        os.close(fd)
+    except OSError:
+        pass
+
+@pytest.mark.skipif(not hasattr(os, 'mkfifo'), reason='needs a fifo')
+@pytest.mark.parametrize('backend', ['thread', 'process'])
+def test_hung_file_doesnt_time_out_the_others(hangingBatch, backend):
+    hang, good = hangingBatch
+    expected = pyPlcXml.parse(good[0])
+    start = time.monotonic()
+    results = dict(pyPlcXml.parseMany([hang] + good, workers=1, backend=backend, timeout=1.0))
+    assert isinstance(results.pop(hang), TimeoutError)
+    assert results == {path : expected for path in good}
+    assert time.monotonic() - start < 10
+
+@pytest.mark.skipif(not hasattr(os, 'mkfifo'), reason='needs a fifo')
+@pytest.mark.parametrize('backend', ['thread', 'process'])
+@pytest.mark.parametrize('ordered', [True, False])
+def test_hung_file_with_many_workers(hangingBatch, backend, ordered):
+    hang, good = hangingBatch
+    expected = pyPlcXml.parse(good[0])
+    paths = [good[0], hang] + good[1:] * 3
+    start = time.monotonic()
+    results = list(pyPlcXml.parseMany(paths, workers=2, backend=backend, ordered=ordered, timeout=1.0))
+    assert time.monotonic() - start < 10
+    if ordered:
+        assert [path for path, result in results] == paths
+    assert sorted(path for path, result in results) == sorted(paths)
+    for path, result in results:
+        if path == hang:
+            assert isinstance(result, TimeoutError)
+        else:
+            assert result == expected
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork', reason='the patched parse must reach the workers')
+@pytest.mark.parametrize('ordered', [True, False])
+def test_chunk_running_next_to_a_timed_out_one_is_parsed_again(tmp_path, monkeypatch, ordered):
+    path = os.path.join(DATA, 'v201.xml')
+    expected = pyPlcXml.parse(path)
+    #Times from the start: hang runs forever, quick runs until 1 s, slow runs from 1 s to 3.5 s
+    #and is still running when hang times out at 3 s
+    delays = {'hang' : 100, 'quick' : 1, 'slow' : 2.5}
+    parse = main.parse
+    monkeypatch.setattr(main, 'parse', lambda name, **kwargs: time.sleep(delays[name]) or parse(path, **kwargs))
+
+    start = time.monotonic()
+    results = list(pyPlcXml.parseMany(['hang', 'quick', 'slow'], workers=2, ordered=ordered, timeout=3))
+    assert time.monotonic() - start < 20
+    if ordered:
+        assert [name for name, result in results] == ['hang', 'quick', 'slow']
+    results = dict(results)
+    assert isinstance(results.pop('hang'), TimeoutError)
+    assert results == {'quick' : expected, 'slow' : expected}
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != 'fork', reason='the patched parse must reach the workers')
+@pytest.mark.parametrize('ordered', [True, False])
+def test_dying_worker_fails_only_its_file(tmp_path, monkeypatch, ordered):
+    good = []
+    for i in range(6):
+        path = tmp_path / f'good{i}.xml'
+        shutil.copy(os.path.join(DATA, 'v201.xml'), path)
+        good.append(str(path))
+    crash = str(tmp_path / 'crash.xml')
+    expected = pyPlcXml.parse(good[0])
+    parse = main.parse
+    monkeypatch.setattr(main, 'parse', lambda path, **kwargs: os._exit(1) if path == crash else parse(path, **kwargs))
+
+    paths = good[:2] + [crash] + good[2:]
+    results = list(pyPlcXml.parseMany(paths, workers=3, ordered=ordered))
+    if ordered:
+        assert [path for path, result in results] == paths
+    results = dict(results)
+    assert isinstance(results.pop(crash), BrokenProcessPool)
+    assert results == {path : expected for path in good}
+
+def test_ordered_keeps_workers_busy_behind_a_slow_file(monkeypatch):
+    path = os.path.join(DATA, 'v201.xml')
+    expected = pyPlcXml.parse(path)
+    parse = main.parse
+    monkeypatch.setattr(main, 'parse', lambda name, **kwargs: time.sleep(2 if name == 'slow' else 0.3) or parse(path, **kwargs))
+
+    names = ['slow'] + [f'quick{i}' for i in range(6)]
+    start = time.monotonic()
+    results = list(pyPlcXml.parseMany(names, workers=2, backend='thread'))
+    #The quick files run on the second worker while the slow one runs, one at a time they would need 2 + 6 * 0.3 / 2 s
+    assert time.monotonic() - start < 2.6
+    assert results == [(name, expected) for name in names]
@@ -0,0 +1,63 @@
+import os
+import pytest
+import pyPlcXml
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+SOURCES = ['v200.xml', 'v201.xml', 'iec.xml', os.path.join('bnr', 'Proj.apj')]
+
+@pytest.fixture(scope='module', params=SOURCES)
+def parsed(request):
+    data = pyPlcXml.parse(os.path.join(DATA, request.param))
+    assert data['namespaces']
+    return data
+
+def test_binary_round_trip(parsed, tmp_path):
+    path = str(tmp_path / 'project.plcx')
+    pyPlcXml.dump(parsed, path)
+    assert pyPlcXml.load(path) == parsed
+    with open(path, 'rb') as f:
+        assert pyPlcXml.load(f) == parsed
+
+def test_json_lines_round_trip(parsed, tmp_path):
+    path = str(tmp_path / 'project.jsonl')
+    count = pyPlcXml.dumpLines(parsed, path)
+    assert pyPlcXml.loadLines(path) == parsed
+
+    records = list(pyPlcXml.iterLines(path))
+    assert len(records) == count
+    assert records[0] == (None, 'info', parsed['info'])
+    #Every item comes back in its namespace and category in the original order
+    for namespace in parsed['namespaces']:
+        for key, value in namespace.items():
+            if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+                assert [item for nsName, kind, item in records if nsName == namespace['name'] and kind == key] == value
+
+def test_json_lines_from_tuples(tmp_path):
+    path = str(tmp_path / 'stream.jsonl')
+    records = list(pyPlcXml.iterTc6(os.path.join(DATA, 'v201.xml')))
+    assert pyPlcXml.dumpLines(iter(records), path) == len(records)
+    assert list(pyPlcXml.iterLines(path)) == [tuple(record) for record in records]
+
+def _withTwincatResource(tmp_path):
+    """Returns the path of v201.xml with a Twincat resource in the project addData"""
+    with open(os.path.join(DATA, 'v201.xml'), encoding='utf-8') as f:
+        text = f.read()
+    resource = ('<addData><data name="http://www.beckhoff.com/plcopenxml/resource" handleUnknown="implementation"><resource name="TcRes">'
+        '<globalVars name="GVL_Tc"><variable name="gTc"><type><INT /></type></variable></globalVars></resource></data></addData>')
+    path = tmp_path / 'both.xml'
+    path.write_text(text.replace('</project>', resource + '</project>'), encoding='utf-8')
+    return str(path)
+
+@pytest.mark.parametrize('ignoredNs', [(), ('Device',), ('Global', 'Device')])
+def test_stream_ignores_twincat_like_parse(tmp_path, ignoredNs):
+    path = _withTwincatResource(tmp_path)
+    parsed = pyPlcXml.parse(path, ignoredNs=list(ignoredNs))
+    streamed = {}
+    for nsName, category, item in pyPlcXml.iterTc6(path, ignoredNs=ignoredNs):
+        if nsName != None:
+            streamed.setdefault(nsName, []).append(item['name'])
+    expected = {namespace['name'] : [item['name'] for key, value in namespace.items() if isinstance(value, list) for item in value]
+                for namespace in parsed['namespaces']}
+    assert {name : sorted(items) for name, items in streamed.items()} == {name : sorted(items) for name, items in expected.items()}
+    #Device is a CODESYS namespace, the Twincat resource is never used even if all CODESYS namespaces are ignored
+    assert 'TcRes' not in streamed
@@ -0,0 +1,18 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import pyPlcXml
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+PATHS = [os.path.join(DATA, 'v200.xml'), os.path.join(DATA, 'v201.xml')]
+
+def test_mixed_tc6_versions_from_32_threads():
+    expected = {path : pyPlcXml.parse(path) for path in PATHS}
+    for data in expected.values():
+        assert data['namespaces'] and any(namespace.get('fbs') or namespace.get('prgs') for namespace in data['namespaces'])
+
+    #v200 and v201 alternate so parses with different namespace maps always overlap
+    paths = PATHS * 320
+    with ThreadPoolExecutor(max_workers=32) as executor:
+        results = list(executor.map(pyPlcXml.parse, paths))
+    for path, result in zip(paths, results):
+        assert result == expected[path]
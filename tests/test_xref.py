@@ -0,0 +1,42 @@
+import os
+import pyPlcXml
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+def _project():
+    local = lambda blockName: [{'name' : blockName, 'attribute' : '', 'vars' : [{'name' : 'gCount', 'type' : 'INT'}]}]
+    return {'namespaces' : [{
+        'name' : 'Ns',
+        'vars' : [{'name' : 'GVL', 'vars' : [{'name' : 'gCount', 'type' : 'INT'}]}],
+        'prgs' : [
+            {'name' : 'PRG_Local', 'if' : local('VAR'), 'code' : 'gCount := gCount + 1;', 'actions' : [{'name' : 'Act', 'code' : 'GCOUNT := 0;'}]},
+            {'name' : 'PRG_Global', 'if' : [], 'code' : 'gCount := 2;\nx := gCount;'}],
+        'fbs' : [{'name' : 'FB_Methods', 'if' : [], 'code' : '', 'methods' : [
+            {'name' : 'Local', 'if' : local('VAR_INPUT'), 'code' : 'gCount := 1;'},
+            {'name' : 'Global', 'if' : [], 'code' : 'gCount := 3;'}]}]
+    }]}
+
+def test_find_usages_skips_shadowing_locals():
+    data = _project()
+    expected = {('Ns', 'PRG_Global') : 2, ('Ns', 'FB_Methods.Global') : 1}
+    assert pyPlcXml.findUsages(data, ['gCount']) == {'gCount' : expected}
+    #Same uses as the references with a code position in XRef
+    references = pyPlcXml.XRef.fromProject(data).references('gCount')
+    assert {(nsName, pouName) for nsName, pouName, line, column in references if line != None} == set(expected)
+
+def test_elementary_types_are_not_symbols():
+    data = _project()
+    xref = pyPlcXml.XRef.fromProject(data)
+    assert xref.references('INT') == []
+    assert 'int' not in xref.unused() and 'int' not in xref.symbols()
+    code = 'x := INT_TO_REAL(i) + REAL#1.5; s := STRING(10); t := TIME#5s;'
+    assert [name for name, offset in pyPlcXml.xref.iterIdentifiers(code)] == ['x', 'INT_TO_REAL', 'i', 's', 't']
+
+def test_find_usages_counts_names_declared_only_locally():
+    data = _project()
+    data['namespaces'][0]['prgs'][0]['code'] += '\nlCount := lCount + 1;'
+    data['namespaces'][0]['prgs'][0]['if'][0]['vars'].append({'name' : 'lCount', 'type' : 'INT'})
+    assert pyPlcXml.findUsages(data, ['lCount']) == {'lCount' : {('Ns', 'PRG_Local') : 2}}
+    #arr is a local of the POUs of the file and of no namespace
+    usages = pyPlcXml.findUsages(pyPlcXml.parse(os.path.join(DATA, 'v201.xml')), ['arr'])['arr']
+    assert usages[('Global', 'PRG_0')] == 1 and usages[('Global', 'PRG_0.Act1')] == 1 and usages[('Device', 'FB_Res')] == 1